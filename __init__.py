@@ -13,6 +13,8 @@ bl_info = {
     "category": "Import-Export",
 }
 
+from .operators import asset_index
+from .operators import attribute_rules
 from .operators import export_fbx
 from .operators import new
 from .operators import create_ref
@@ -20,9 +22,14 @@ from .operators import sockets
 from .operators import clean
 from .operators import move_cursor_boundX
 from .operators import quick_weld
+from .operators import lightmap_uvs
+from .operators import upload_queue
+from .operators import worker_pool
 from .ui import pie_menu
 from . import ui
 modules = (
+    asset_index,
+    attribute_rules,
     export_fbx,
     pie_menu,
     new,
@@ -31,6 +38,9 @@ modules = (
     clean,
     move_cursor_boundX,
     quick_weld,
+    lightmap_uvs,
+    upload_queue,
+    worker_pool,
 )
 
 # ------------------------------------------------------------------------
@@ -58,10 +68,228 @@ class UEFbxExporterPreferences(AddonPreferences):
         default='FACE'
     ) # type: ignore
 
+    stage_exports: bpy.props.EnumProperty(
+        name="Stage Exports Locally",
+        description="Write exports to a local folder and upload them to the export folder in the background",
+        items=[
+            ('AUTO', "Network Folders", "Stage only when the export folder is on a network share"),
+            ('ALWAYS', "Always", "Always stage and upload in the background"),
+            ('NEVER', "Never", "Write straight into the export folder"),
+        ],
+        default='AUTO'
+    ) # type: ignore
+
+    history_enabled: bpy.props.BoolProperty(
+        name="Record Export History",
+        description="Append timings, sizes and peak memory of every exported root to a local database",
+        default=True
+    ) # type: ignore
+
+    history_regression_threshold: bpy.props.FloatProperty(
+        name="Regression Threshold %",
+        description="Flag roots whose latest export time rose more than this percentage over their rolling median",
+        default=25.0,
+        min=0.0,
+        soft_max=500.0
+    ) # type: ignore
+
+    history_window: bpy.props.IntProperty(
+        name="Rolling Window",
+        description="Number of previous exports used for the rolling median",
+        default=5,
+        min=1,
+        max=100
+    ) # type: ignore
+
+    worker_count: bpy.props.IntProperty(
+        name="Background Workers",
+        description=(
+            "Number of background Blender processes used by Export in Background. They keep the file loaded "
+            "between exports and are restarted when it changes on disk. 0 disables background export"
+        ),
+        default=0,
+        min=0,
+        soft_max=8
+    ) # type: ignore
+
+    isolate_evaluation: bpy.props.BoolProperty(
+        name="Evaluate Exported Objects Only",
+        description=(
+            "Evaluate each export in a temporary scene holding only the exported hierarchy and the objects it "
+            "depends on, instead of the whole view layer"
+        ),
+        default=True
+    ) # type: ignore
+
+    memory_budget_mb: bpy.props.IntProperty(
+        name="Memory Budget (MB)",
+        description=(
+            "Estimated peak memory allowed per chunk when exporting several roots. "
+            "Unused meshes are freed between chunks. 0 disables chunking"
+        ),
+        default=8192,
+        min=0,
+        soft_max=65536
+    ) # type: ignore
+
+    optimize_triangle_order: bpy.props.BoolProperty(
+        name="Optimize Triangle Order",
+        description=(
+            "Reorder triangles and vertices of exported meshes for GPU vertex cache reuse and overdraw "
+            "(Tipsify). Scene data is not modified"
+        ),
+        default=False
+    ) # type: ignore
+
+    estimate_render_vertices: bpy.props.BoolProperty(
+        name="Estimate Render Vertices",
+        description="Count the unique (position, normal, UV, color) wedges UE will build for every exported mesh",
+        default=False
+    ) # type: ignore
+
+    merge_split_attributes: bpy.props.BoolProperty(
+        name="Merge Near-Identical Splits",
+        description="Merge normals, UVs and colors around a vertex that differ by less than the tolerance",
+        default=False
+    ) # type: ignore
+
+    split_merge_tolerance: bpy.props.FloatProperty(
+        name="Split Tolerance",
+        description="Largest per-component difference merged by Merge Near-Identical Splits",
+        default=0.0001,
+        min=0.0,
+        soft_max=0.01,
+        precision=5
+    ) # type: ignore
+
+    export_tangents: bpy.props.BoolProperty(
+        name="Export Tangents",
+        description=(
+            "Write MikkTSpace tangents and bitangent signs into the FBX so UE can import them "
+            "instead of recomputing them. Meshes with degenerate UVs are reported"
+        ),
+        default=False
+    ) # type: ignore
+
+    merge_meshes: bpy.props.BoolProperty(
+        name="Merge Meshes per Asset",
+        description=(
+            "Export the meshes under each dummy as a single mesh, with transforms baked relative to the dummy "
+            "and identical materials sharing one slot. Scene objects are not joined"
+        ),
+        default=False
+    ) # type: ignore
+
+    detect_instances: bpy.props.BoolProperty(
+        name="Detect Instances",
+        description=(
+            "Write meshes repeated under an asset (same geometry up to rotation, translation and uniform scale) "
+            "once and list the other copies' transforms in a .instances.json file next to the FBX"
+        ),
+        default=False
+    ) # type: ignore
+
+    generate_lightmap_uvs: bpy.props.BoolProperty(
+        name="Generate Lightmap UVs",
+        description=(
+            "Add a lightmap UV channel to exported meshes: faces are split into charts by axis and angle, "
+            "and the charts of all meshes of an asset are packed together without overlaps. "
+            "Disable Generate Lightmap UVs in UE's import settings"
+        ),
+        default=False
+    ) # type: ignore
+
+    lightmap_uv_name: bpy.props.StringProperty(
+        name="Lightmap UV Map",
+        description="Name of the generated UV map. An existing UV map with this name is replaced in the export",
+        default="LightmapUV"
+    ) # type: ignore
+
+    lightmap_resolution: bpy.props.IntProperty(
+        name="Lightmap Resolution",
+        description="Lightmap resolution the padding is measured in (UE's Light Map Resolution of the asset)",
+        default=64,
+        min=4,
+        soft_max=4096
+    ) # type: ignore
+
+    lightmap_padding: bpy.props.IntProperty(
+        name="Lightmap Padding",
+        description="Space between lightmap charts, in lightmap texels",
+        default=2,
+        min=0,
+        soft_max=8
+    ) # type: ignore
+
+    mesh_cache_enabled: bpy.props.BoolProperty(
+        name="Cache Evaluated Meshes",
+        description=(
+            "Store evaluated meshes of objects with modifiers on disk and reuse them while the source mesh, "
+            "modifier settings and referenced objects are unchanged"
+        ),
+        default=False
+    ) # type: ignore
+
+    mesh_cache_dir: StringProperty(
+        name="Cache Folder",
+        description="Folder of the evaluated mesh cache. Empty uses the system temporary folder",
+        subtype='DIR_PATH',
+        default=""
+    ) # type: ignore
+
+    mesh_cache_size_mb: bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used entries are removed once the cache grows past this size. 0 is unbounded",
+        default=2048,
+        min=0,
+        soft_max=65536
+    ) # type: ignore
+
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "export_path")
+        layout.prop(self, "stage_exports")
         layout.prop(self, "mesh_smooth_type")
+        layout.prop(self, "memory_budget_mb")
+        layout.prop(self, "isolate_evaluation")
+        layout.prop(self, "worker_count")
+
+        box = layout.box()
+        box.label(text="Evaluated Mesh Cache")
+        box.prop(self, "mesh_cache_enabled")
+        col = box.column()
+        col.enabled = self.mesh_cache_enabled
+        col.prop(self, "mesh_cache_dir")
+        col.prop(self, "mesh_cache_size_mb")
+
+        box = layout.box()
+        box.label(text="Export Stages")
+        box.prop(self, "estimate_render_vertices")
+        row = box.row(align=True)
+        row.enabled = self.estimate_render_vertices
+        row.prop(self, "merge_split_attributes")
+        row.prop(self, "split_merge_tolerance")
+        box.prop(self, "merge_meshes")
+        row = box.row()
+        row.enabled = not self.merge_meshes
+        row.prop(self, "detect_instances")
+        box.prop(self, "optimize_triangle_order")
+        box.prop(self, "export_tangents")
+        box.prop(self, "generate_lightmap_uvs")
+        col = box.column(align=True)
+        col.enabled = self.generate_lightmap_uvs
+        col.prop(self, "lightmap_uv_name")
+        row = col.row(align=True)
+        row.prop(self, "lightmap_resolution")
+        row.prop(self, "lightmap_padding")
+
+        box = layout.box()
+        box.label(text="Export History")
+        box.prop(self, "history_enabled")
+        row = box.row(align=True)
+        row.enabled = self.history_enabled
+        row.prop(self, "history_regression_threshold")
+        row.prop(self, "history_window")
 
 # ------------------------------------------------------------------------
 # Register
@@ -0,0 +1,169 @@
+import bpy
+from bpy.app.handlers import persistent
+
+# ------------------------------
+# Asset root index
+# ------------------------------
+#
+# Maps every object to the top-most ancestor of its hierarchy (the asset dummy) and
+# every root to its members, so operators resolve roots in constant time per object
+# instead of walking parent chains and children_recursive for every selection.
+# Built on file load, kept current from depsgraph updates and rebuilt lazily
+# whenever an update can't be applied incrementally (deletes, renames, undo).
+# There are no per-root mesh, socket or REF_ lists: Create Socket and Create Ref
+# Hierarchy act on the direct empty parent and nothing else looks them up.
+
+
+def _walk_root(obj):
+    while obj.parent:
+        obj = obj.parent
+    return obj
+
+
+class AssetIndex:
+    def __init__(self):
+        # object name -> root name
+        self._root_of = {}
+        # root name -> {member name: None} (ordered set, root first)
+        self._members = {}
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def rebuild(self):
+        root_of = {}
+        members = {}
+        for obj in bpy.data.objects:
+            chain = []
+            node = obj
+            while node.name not in root_of and node.parent:
+                chain.append(node)
+                node = node.parent
+            root = root_of.get(node.name, node.name)
+            root_of[node.name] = root
+            for o in chain:
+                root_of[o.name] = root
+        for name, root in root_of.items():
+            members.setdefault(root, {root: None})[name] = None
+        self._root_of = root_of
+        self._members = members
+        self.dirty = False
+
+    def _ensure(self):
+        if self.dirty:
+            self.rebuild()
+
+    def _set_root(self, obj, root_name):
+        old = self._root_of.get(obj.name)
+        if old == root_name:
+            return
+        if old is not None:
+            self._members.get(old, {}).pop(obj.name, None)
+            if old == obj.name and old != root_name:
+                self._members.pop(old, None)
+        self._root_of[obj.name] = root_name
+        self._members.setdefault(root_name, {root_name: None})[obj.name] = None
+
+    def refresh(self, obj):
+        """Re-resolve the root of `obj` (and its descendants if the root changed)"""
+        if self.dirty:
+            return
+        if obj.name not in self._root_of and len(self._root_of) >= len(bpy.data.objects):
+            # Unknown name but no new object: a rename we can't map back
+            self.dirty = True
+            return
+        root_name = _walk_root(obj).name
+        if self._root_of.get(obj.name) == root_name:
+            return
+        self._set_root(obj, root_name)
+        for child in obj.children_recursive:
+            self._set_root(child, root_name)
+
+    def root(self, obj):
+        """Top-most ancestor of `obj`"""
+        self._ensure()
+        root = bpy.data.objects.get(self._root_of.get(obj.name, ""))
+        if root is None:
+            # Stale entry (renamed/deleted since the last update): answer directly, rebuild later
+            self.dirty = True
+            return _walk_root(obj)
+        return root
+
+    def roots(self, objects):
+        """Unique roots of `objects`, in selection order"""
+        return list(dict.fromkeys(self.root(o) for o in objects))
+
+    def hierarchy(self, root):
+        """`root` and all its descendants"""
+        self._ensure()
+        names = self._members.get(root.name)
+        if names is None:
+            return [root] + list(root.children_recursive)
+        objects = [bpy.data.objects.get(name) for name in names]
+        if any(o is None for o in objects):
+            self.dirty = True
+            return [root] + list(root.children_recursive)
+        return objects
+
+    def assign(self, obj, root):
+        """Record a reparenting done by an operator before the depsgraph reports it"""
+        if self.dirty:
+            return
+        self._root_of.setdefault(root.name, root.name)
+        self._members.setdefault(root.name, {root.name: None})
+        self._set_root(obj, root.name)
+        for child in obj.children_recursive:
+            self._set_root(child, root.name)
+
+
+index = AssetIndex()
+
+# ------------------------------
+# Handlers
+# ------------------------------
+
+@persistent
+def _on_load_post(*args):
+    index.rebuild()
+
+
+@persistent
+def _on_undo_redo(*args):
+    index.invalidate()
+
+
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    if index.dirty:
+        return
+    if len(bpy.data.objects) != len(index._root_of):
+        # Objects were added or deleted
+        index.invalidate()
+        return
+    for update in depsgraph.updates:
+        if isinstance(update.id, bpy.types.Object) and update.is_updated_transform:
+            index.refresh(update.id.original)
+            if index.dirty:
+                return
+
+
+_handlers = (
+    (bpy.app.handlers.load_post, _on_load_post),
+    (bpy.app.handlers.undo_post, _on_undo_redo),
+    (bpy.app.handlers.redo_post, _on_undo_redo),
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update_post),
+)
+
+
+def register():
+    for handlers, handler in _handlers:
+        if handler not in handlers:
+            handlers.append(handler)
+    index.invalidate()
+
+
+def unregister():
+    for handlers, handler in _handlers:
+        if handler in handlers:
+            handlers.remove(handler)
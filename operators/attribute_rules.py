@@ -0,0 +1,112 @@
+import bpy
+from bpy.props import BoolProperty, IntProperty, StringProperty, PointerProperty
+
+from . import asset_index
+
+# ------------------------------
+# Export attribute rules
+# ------------------------------
+#
+# Per-root rules stored on the asset dummy that strip UV maps, color attributes
+# and generic attributes from the export snapshot only; the scene meshes keep
+# everything.
+
+# Attributes the FBX writer reads for materials, smoothing and creases
+BUILTIN_ATTRIBUTES = {
+    "material_index", "sharp_face", "sharp_edge",
+    "crease_edge", "crease_vert", "bevel_weight_edge", "bevel_weight_vert",
+}
+
+COLOR_TYPES = {'FLOAT_COLOR', 'BYTE_COLOR'}
+
+
+class UEExportAttributeRules(bpy.types.PropertyGroup):
+    enabled: BoolProperty(
+        name="Strip Attributes",
+        description="Strip attributes from the exported copies of this asset's meshes",
+        default=False
+    ) # type: ignore
+
+    uv_maps_to_keep: IntProperty(
+        name="UV Maps to Keep",
+        description="Number of UV maps exported, in the mesh's UV map order (UV0 first)",
+        default=8,
+        min=0,
+        max=8
+    ) # type: ignore
+
+    drop_color_attributes: BoolProperty(
+        name="Drop Color Attributes",
+        description="Export no vertex colors",
+        default=False
+    ) # type: ignore
+
+    keep_attributes: StringProperty(
+        name="Keep Attributes",
+        description="Comma-separated generic attributes kept in the export copy; all others are dropped",
+        default=""
+    ) # type: ignore
+
+
+def is_uv_map(domain, data_type):
+    return domain == 'CORNER' and data_type == 'FLOAT2'
+
+
+def attributes_to_strip(obj, arrays, rules):
+    """Names of the attributes of `arrays` the rules drop"""
+    uv_order = [uv.name for uv in obj.data.uv_layers]
+    uv_names = [name for name, (domain, data_type, _) in arrays.attributes.items() if is_uv_map(domain, data_type)]
+    uv_names.sort(key=lambda name: uv_order.index(name) if name in uv_order else len(uv_order))
+    keep = {name.strip() for name in rules.keep_attributes.split(",") if name.strip()}
+
+    strip = set(uv_names[rules.uv_maps_to_keep:])
+    for name, (domain, data_type, _) in arrays.attributes.items():
+        if name in BUILTIN_ATTRIBUTES or is_uv_map(domain, data_type):
+            continue
+        if data_type in COLOR_TYPES:
+            if rules.drop_color_attributes:
+                strip.add(name)
+        elif name not in keep:
+            strip.add(name)
+    return strip
+
+
+def rules_in_use(roots):
+    return any(root.ue_export_rules.enabled for root in roots)
+
+
+def export_stage(snapshot, obj, arrays):
+    rules = asset_index.index.root(obj).ue_export_rules
+    if not rules.enabled:
+        return arrays
+    stripped = sorted(attributes_to_strip(obj, arrays, rules))
+    if not stripped:
+        return arrays
+    # The FBX writer only emits UV maps and colors; generic attributes never reach the file
+    written = 0
+    for name in stripped:
+        domain, data_type, _ = arrays.attributes.pop(name)
+        if is_uv_map(domain, data_type) or data_type in COLOR_TYPES:
+            written += 1
+    snapshot.totals["stripped_layers"] = snapshot.totals.get("stripped_layers", 0) + written
+    snapshot.report.append(f"{obj.name}: stripped {', '.join(stripped)}")
+    return arrays
+
+
+def root_summary(name, totals):
+    if not totals.get("stripped_layers"):
+        return None
+    return f"{name}: {totals['stripped_layers']} UV/color layers left out of the file"
+
+# ------------------------------
+# Registration
+# ------------------------------
+
+def register():
+    bpy.utils.register_class(UEExportAttributeRules)
+    bpy.types.Object.ue_export_rules = PointerProperty(type=UEExportAttributeRules)
+
+
+def unregister():
+    del bpy.types.Object.ue_export_rules
+    bpy.utils.unregister_class(UEExportAttributeRules)
@@ -1,4 +1,5 @@
 import bpy
+from . import asset_index
 
 # ------------------------------
 # Operator: Create Reference Hierarchy
@@ -29,12 +30,7 @@ class OBJECT_OT_CreateRefHierarchy(bpy.types.Operator):
             return {'CANCELLED'}
 
                 # 2. Collect and select full hierarchy (root + all descendants)
-        hierarchy = []
-        def collect(obj):
-            hierarchy.append(obj)
-            for child in obj.children:
-                collect(child)
-        collect(root)
+        hierarchy = asset_index.index.hierarchy(root)
         bpy.ops.object.select_all(action='DESELECT')
         for obj in hierarchy:
             obj.select_set(True)
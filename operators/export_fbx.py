@@ -1,5 +1,280 @@
 import bpy
 import os
+from . import asset_index
+from . import attribute_rules
+from . import export_history
+from . import export_scheduler
+from . import instancing
+from . import lightmap_uvs
+from . import render_vertices
+from . import tangents
+from . import upload_queue
+from . import vertex_cache
+from .export_scene import ExportScene
+from .export_snapshot import ExportSnapshot
+from .mesh_cache import MeshCache
+from .export_stats import RootStats, PeakMemorySampler
+
+# ------------------------------
+# Exporter settings
+# ------------------------------
+
+def fbx_export_settings(prefs):
+    """Keyword arguments for bpy.ops.export_scene.fbx (filepath excluded)"""
+    return dict(
+        use_selection=True,
+        check_existing=False,
+        filter_glob="*.fbx",
+        use_active_collection=False,
+        global_scale=1.0,
+        apply_unit_scale=True,
+        apply_scale_options='FBX_SCALE_NONE',
+        bake_space_transform=False,
+        object_types={'ARMATURE', 'MESH', 'OTHER'},
+        use_mesh_modifiers=True,
+        use_mesh_modifiers_render=True,
+        mesh_smooth_type=prefs.mesh_smooth_type,
+        use_subsurf=False,
+        use_mesh_edges=False,
+        use_tspace=getattr(prefs, "export_tangents", False),
+        use_custom_props=False,
+        add_leaf_bones=True,
+        primary_bone_axis='Y',
+        secondary_bone_axis='X',
+        use_armature_deform_only=False,
+        path_mode='AUTO',
+        embed_textures=False,
+        batch_mode='OFF',
+        use_batch_own_dir=True,
+        use_metadata=True,
+        use_triangles=True,
+        axis_forward='Y',
+        axis_up='Z'
+    )
+
+STL_EXPORT_SETTINGS = dict(
+    use_selection=True,
+    global_scale=1.0,
+    ascii=False,
+    use_mesh_modifiers=True,
+    batch_mode='OFF',
+    axis_forward='Y',
+    axis_up='Z'
+)
+
+
+def resolve_export_dir(scene, prefs):
+    """Export folder: the scene override path if set, else the preferences path; "" when neither is set"""
+    # Get raw values
+    raw_prefs_path = getattr(prefs, 'export_path', '')
+
+    # Try to get override path from scene
+    if hasattr(scene, 'fbx_export_override_path'):
+        raw_override_path = getattr(scene, 'fbx_export_override_path', '')
+        print(f"Scene has 'fbx_export_override_path': {raw_override_path!r}")
+    elif hasattr(scene, 'export_path'):
+        raw_override_path = getattr(scene, 'export_path', '')
+        print(f"Scene has 'export_path': {raw_override_path!r}")
+    else:
+        raw_override_path = ''
+        print("Scene does NOT have 'fbx_export_override_path' or 'export_path' property!")
+
+    # Only call abspath if not empty
+    prefs_path = bpy.path.abspath(raw_prefs_path) if raw_prefs_path else ''
+    override_path = bpy.path.abspath(raw_override_path) if raw_override_path else ''
+
+    # Debug: print paths for troubleshooting
+    print(f"prefs.export_path: '{raw_prefs_path}' -> '{prefs_path}'")
+    print(f"scene.export_path: '{raw_override_path}' -> '{override_path}'")
+
+    # Prefer override path if set, then prefs path
+    if override_path and override_path != "//":
+        return override_path
+    if prefs_path and prefs_path != "//":
+        return prefs_path
+    return ""
+
+
+def export_base_name(active):
+    """File name (no extension) of a single-root export: the parent dummy of the active object"""
+    if active and active.parent:
+        return active.parent.name
+    if active:
+        return active.name
+    return bpy.path.clean_name(bpy.path.display_name_from_filepath(bpy.data.filepath)) or "exported_scene"
+
+
+def export_file(filepath, use_stl, settings):
+    if use_stl:
+        bpy.ops.export_mesh.stl(filepath=filepath.replace('.fbx', '.stl'), **STL_EXPORT_SETTINGS)
+    else:
+        bpy.ops.export_scene.fbx(filepath=filepath, **settings)
+
+
+def snapshot_stages(prefs, roots=()):
+    """Export stages enabled in the preferences (and the attribute rules of `roots`),
+    in the order they run on each mesh"""
+    stages = []
+    if attribute_rules.rules_in_use(roots):
+        stages.append(attribute_rules.export_stage)
+    if getattr(prefs, "estimate_render_vertices", False):
+        stages.append(render_vertices.make_export_stage(prefs.merge_split_attributes, prefs.split_merge_tolerance))
+    if getattr(prefs, "optimize_triangle_order", False):
+        stages.append(vertex_cache.export_stage)
+    return stages
+
+
+def make_mesh_cache(prefs):
+    """The evaluated mesh cache enabled in the preferences, None when disabled"""
+    if not getattr(prefs, "mesh_cache_enabled", False):
+        return None
+    return MeshCache(prefs.mesh_cache_dir, prefs.mesh_cache_size_mb * 1024 * 1024)
+
+
+def make_lightmap_packer(prefs):
+    """The lightmap UV packer enabled in the preferences, None when disabled"""
+    if not getattr(prefs, "generate_lightmap_uvs", False):
+        return None
+    return lightmap_uvs.LightmapPacker(prefs.lightmap_uv_name, prefs.lightmap_resolution, prefs.lightmap_padding)
+
+
+def cache_summary(name, totals):
+    if "mesh_cache_hits" not in totals and "mesh_cache_misses" not in totals:
+        return None
+    return f"{name}: mesh cache {totals.get('mesh_cache_hits', 0)} hits, {totals.get('mesh_cache_misses', 0)} misses"
+
+
+def detects_instances(prefs, use_stl):
+    """Whether export_root runs instance detection, and so writes or removes the side-car"""
+    if use_stl or getattr(prefs, "merge_meshes", False):
+        return False
+    return getattr(prefs, "detect_instances", False)
+
+
+def export_root(stats, filepath, use_stl, settings, objects, export_scene, stages, cache=None, root=None, prefs=None):
+    """Write one file from `export_scene` (ExportScene). With export stages, the mesh cache,
+    merging, instancing or lightmap UVs enabled the meshes go through an export snapshot.
+    Returns the report lines of the tangent UV check and the stages."""
+    merge = getattr(prefs, "merge_meshes", False)
+    detect_instances = detects_instances(prefs, use_stl)
+    lightmap = make_lightmap_packer(prefs)
+    report = []
+    if getattr(prefs, "export_tangents", False) and not use_stl:
+        with stats.phase("validate"):
+            report = tangents.check_uvs(objects, export_scene.depsgraph)
+    if use_stl or not (stages or cache or merge or detect_instances or lightmap):
+        with stats.phase("write"), export_scene.override():
+            export_file(filepath, use_stl, settings)
+        return report
+
+    snapshot = ExportSnapshot(objects, export_scene.depsgraph, stages, cache, root, merge, detect_instances, lightmap)
+    if export_scene.enabled:
+        snapshot.collection = export_scene.scene.collection
+    with export_scene.override():
+        try:
+            with stats.phase("snapshot"):
+                snapshot.build()
+                snapshot.swap()
+            with stats.phase("write"):
+                export_file(filepath, use_stl, settings)
+        finally:
+            with stats.phase("restore"):
+                snapshot.restore()
+
+    if detect_instances:
+        sidecar = instancing.write_sidecar(filepath, stats.name, snapshot.instances)
+        if sidecar:
+            snapshot.report.append(f"{stats.name}: instance transforms written to {os.path.basename(sidecar)}")
+
+    summaries = (
+        attribute_rules.root_summary(stats.name, snapshot.totals),
+        render_vertices.root_summary(stats.name, snapshot.totals),
+        cache_summary(stats.name, snapshot.totals),
+    )
+    for summary in summaries:
+        if summary:
+            snapshot.report.append(summary)
+    return report + snapshot.report
+
+
+def export_hierarchy(context, root, write_dir, use_stl, settings, stages, cache, prefs, isolate=True):
+    """Export the visible hierarchy of `root` to `<write_dir>/<root name>` in its own export scene,
+    with an empty root zeroed. Used for every root of a multi-root export and by the background
+    workers. Leaves the hierarchy selected; returns (RootStats, filepath, report lines), None when
+    the hierarchy has no mesh with faces."""
+    stats = RootStats(root.name)
+    group_objs = [o for o in asset_index.index.hierarchy(root) if o.visible_get()]
+    with PeakMemorySampler() as memory, ExportScene(group_objs, isolate) as export_scene:
+        with stats.phase("validate"):
+            depsgraph = export_scene.depsgraph
+
+            # Validate: at least one non-empty mesh
+            has_valid_mesh = False
+            for obj in group_objs:
+                if obj.type != 'MESH':
+                    continue
+                eval_obj = obj.evaluated_get(depsgraph)
+                tmp = None
+                try:
+                    try:
+                        tmp = eval_obj.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
+                    except TypeError:
+                        tmp = eval_obj.to_mesh()
+                    if tmp and len(tmp.polygons) > 0 and len(tmp.vertices) > 0:
+                        has_valid_mesh = True
+                        break
+                finally:
+                    if eval_obj and tmp:
+                        eval_obj.to_mesh_clear()
+        if not has_valid_mesh:
+            return None
+
+        with stats.phase("prepare"):
+            stats.add_mesh_counts(group_objs, depsgraph)
+
+            # Reselect only this hierarchy
+            bpy.ops.object.select_all(action='DESELECT')
+            for o in group_objs:
+                o.select_set(True)
+            context.view_layer.objects.active = root
+            export_scene.sync_selection()
+
+            # Temporary zero empty dummy root
+            dummy = root if root.type == 'EMPTY' else None
+            orig_loc = orig_rot = None
+            if dummy:
+                orig_loc = dummy.location.copy()
+                orig_rot = dummy.rotation_euler.copy()
+                dummy.location = (0.0, 0.0, 0.0)
+                dummy.rotation_euler = (0.0, 0.0, 0.0)
+                export_scene.update()
+
+        # Build path and export
+        os.makedirs(write_dir, exist_ok=True)
+        filepath = os.path.join(write_dir, f"{root.name}{'.stl' if use_stl else '.fbx'}")
+        try:
+            report = export_root(
+                stats, filepath, use_stl, settings, group_objs, export_scene, stages, cache,
+                root=root, prefs=prefs,
+            )
+        finally:
+            # Restore dummy
+            with stats.phase("restore"):
+                if dummy and orig_loc is not None and orig_rot is not None:
+                    dummy.location = orig_loc
+                    dummy.rotation_euler = orig_rot
+                    export_scene.update()
+    stats.peak_memory = memory.delta
+    stats.finish(filepath.replace('.fbx', '.stl') if use_stl else filepath)
+    return stats, filepath, report
+
+
+def record_history(prefs, stats, settings, use_stl):
+    if not getattr(prefs, "history_enabled", True):
+        return
+    key = export_history.settings_hash(dict(settings, stl=use_stl))
+    export_history.record_exports(stats, key)
+
 
 class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
     bl_idname = "export_scene.ue_fbx"
@@ -28,6 +303,9 @@ class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
     def execute(self, context):
         # --- New: Handle Local View (Isolated) Mode ---
         def get_view3d_override(ctx):
+            # No window in background mode (export workers)
+            if ctx.window is None:
+                return None
             for area in ctx.window.screen.areas:
                 if area.type == 'VIEW_3D':
                     for region in area.regions:
@@ -63,161 +341,67 @@ class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
                     print(f"[UEFbxExporter] Failed to exit Local View automatically: {e}")
 
         prefs = context.preferences.addons["UEFbxExporter"].preferences
-        scene = context.scene
-
-        # Get raw values
-        raw_prefs_path = getattr(prefs, 'export_path', '')
-
-        # Try to get override path from scene
-        if hasattr(scene, 'fbx_export_override_path'):
-            raw_override_path = getattr(scene, 'fbx_export_override_path', '')
-            print(f"Scene has 'fbx_export_override_path': {raw_override_path!r}")
-        elif hasattr(scene, 'export_path'):
-            raw_override_path = getattr(scene, 'export_path', '')
-            print(f"Scene has 'export_path': {raw_override_path!r}")
-        else:
-            raw_override_path = ''
-            print("Scene does NOT have 'fbx_export_override_path' or 'export_path' property!")
-
-        # Only call abspath if not empty
-        prefs_path = bpy.path.abspath(raw_prefs_path) if raw_prefs_path else ''
-        override_path = bpy.path.abspath(raw_override_path) if raw_override_path else ''
-
-        # Debug: print paths for troubleshooting
-        print(f"prefs.export_path: '{raw_prefs_path}' -> '{prefs_path}'")
-        print(f"scene.export_path: '{raw_override_path}' -> '{override_path}'")
-
-        # Prefer override path if set, then prefs path
-        if override_path and override_path != "//":
-            export_dir = override_path
-        elif prefs_path and prefs_path != "//":
-            export_dir = prefs_path
-        else:
+        export_dir = resolve_export_dir(context.scene, prefs)
+        if not export_dir:
             self.report({'WARNING'}, "No export path set in preferences or scene. Please set a valid export path.")
             return {'CANCELLED'}
 
-        # Warn if export_dir is empty or invalid
-        if not export_dir or export_dir == "//":
-            self.report({'WARNING'}, "No export path set in preferences or scene. Please set a valid export path.")
-            return {'CANCELLED'}
+        # Remote export folders are written locally and uploaded in the background
+        write_dir = upload_queue.write_dir(export_dir, prefs)
+        staged = write_dir != export_dir
 
         # --- New: Export each selected root hierarchy separately ---
-        selected_roots = []
         selected_objs = list(context.selected_objects) if context.selected_objects else []
         if not selected_objs and context.active_object:
             selected_objs = [context.active_object]
-        for o in selected_objs:
-            r = o
-            while r.parent:
-                r = r.parent
-            if r not in selected_roots:
-                selected_roots.append(r)
+        selected_roots = asset_index.index.roots(selected_objs)
+
+        fbx_settings = fbx_export_settings(prefs)
+        stages = snapshot_stages(prefs, selected_roots)
+        cache = make_mesh_cache(prefs)
+        export_stats = []
 
         if len(selected_roots) > 1:
             exported_count = 0
             use_stl = getattr(self, "shift", False)
-            ext = ".stl" if use_stl else ".fbx"
-            depsgraph = bpy.context.evaluated_depsgraph_get()
+            # With isolated evaluation the user's view layer is never evaluated as a whole:
+            # footprints come from the source meshes and each root gets its own export scene
+            isolate = getattr(prefs, "isolate_evaluation", True)
+            depsgraph = None if isolate else bpy.context.evaluated_depsgraph_get()
             saved_selection = list(context.selected_objects)
             saved_active = context.view_layer.objects.active
             try:
-                for root in selected_roots:
-                    # Build hierarchy selection
-                    group_objs = [root] + list(root.children_recursive)
-                    group_objs = [o for o in group_objs if o.visible_get()]
-
-                    # Validate: at least one non-empty mesh
-                    has_valid_mesh = False
-                    for obj in group_objs:
-                        if obj.type != 'MESH':
-                            continue
-                        eval_obj = obj.evaluated_get(depsgraph)
-                        tmp = None
-                        try:
-                            try:
-                                tmp = eval_obj.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
-                            except TypeError:
-                                tmp = eval_obj.to_mesh()
-                            if tmp and len(tmp.polygons) > 0 and len(tmp.vertices) > 0:
-                                has_valid_mesh = True
-                                break
-                        finally:
-                            if eval_obj and tmp:
-                                eval_obj.to_mesh_clear()
-                    if not has_valid_mesh:
+                # Estimate every root's footprint up front and export in memory-bounded chunks
+                overhead = export_history.memory_overhead(export_scheduler.DEFAULT_OVERHEAD)
+                budget = getattr(prefs, "memory_budget_mb", 0) * 1024 * 1024
+                schedule = export_scheduler.schedule_roots(
+                    selected_roots,
+                    lambda r: [o for o in asset_index.index.hierarchy(r) if o.visible_get()],
+                    depsgraph,
+                    budget,
+                    overhead,
+                )
+                for root, footprint, starts_chunk in schedule:
+                    if starts_chunk and export_stats:
+                        export_scheduler.free_memory()
+                    result = export_hierarchy(
+                        context, root, write_dir, use_stl, fbx_settings, stages, cache, prefs, isolate,
+                    )
+                    if result is None:
                         continue
-
-                    # Reselect only this hierarchy
-                    bpy.ops.object.select_all(action='DESELECT')
-                    for o in group_objs:
-                        o.select_set(True)
-                    context.view_layer.objects.active = root
-
-                    # Temporary zero empty dummy root
-                    dummy = root if root.type == 'EMPTY' else None
-                    orig_loc = orig_rot = None
-                    if dummy:
-                        orig_loc = dummy.location.copy()
-                        orig_rot = dummy.rotation_euler.copy()
-                        dummy.location = (0.0, 0.0, 0.0)
-                        dummy.rotation_euler = (0.0, 0.0, 0.0)
-                        bpy.context.view_layer.update()
-
-                    # Build path and export
-                    os.makedirs(export_dir, exist_ok=True)
-                    base_name = root.name
-                    filepath = os.path.join(export_dir, f"{base_name}{ext}")
-
-                    if use_stl:
-                        bpy.ops.export_mesh.stl(
-                            filepath=filepath.replace('.fbx', '.stl'),
-                            use_selection=True,
-                            global_scale=1.0,
-                            ascii=False,
-                            use_mesh_modifiers=True,
-                            batch_mode='OFF',
-                            axis_forward='Y',
-                            axis_up='Z'
-                        )
-                    else:
-                        bpy.ops.export_scene.fbx(
-                            filepath=filepath,
-                            use_selection=True,
-                            check_existing=False,
-                            filter_glob="*.fbx",
-                            use_active_collection=False,
-                            global_scale=1.0,
-                            apply_unit_scale=True,
-                            apply_scale_options='FBX_SCALE_NONE',
-                            bake_space_transform=False,
-                            object_types={'ARMATURE', 'MESH', 'OTHER'},
-                            use_mesh_modifiers=True,
-                            use_mesh_modifiers_render=True,
-                            mesh_smooth_type=prefs.mesh_smooth_type,
-                            use_subsurf=False,
-                            use_mesh_edges=False,
-                            use_tspace=False,
-                            use_custom_props=False,
-                            add_leaf_bones=True,
-                            primary_bone_axis='Y',
-                            secondary_bone_axis='X',
-                            use_armature_deform_only=False,
-                            path_mode='AUTO',
-                            embed_textures=False,
-                            batch_mode='OFF',
-                            use_batch_own_dir=True,
-                            use_metadata=True,
-                            use_triangles=True,
-                            axis_forward='Y',
-                            axis_up='Z'
-                        )
+                    stats, filepath, report = result
+                    stats.estimated_memory = footprint
+                    for line in report:
+                        self.report({'INFO'}, line)
                     exported_count += 1
-
-                    # Restore dummy
-                    if dummy and orig_loc is not None and orig_rot is not None:
-                        dummy.location = orig_loc
-                        dummy.rotation_euler = orig_rot
-                        bpy.context.view_layer.update()
+                    export_stats.append(stats)
+                    # After finish: the upload moves the staged file away
+                    if staged:
+                        upload_queue.upload_outputs(filepath, export_dir, detects_instances(prefs, use_stl))
+                    print(
+                        f"[UEFbxExporter] {root.name}: estimated {footprint * overhead / 1048576:.0f} MB,"
+                        f" peak {stats.peak_memory / 1048576:.0f} MB"
+                    )
             finally:
                 # Restore original selection
                 bpy.ops.object.select_all(action='DESELECT')
@@ -252,6 +436,11 @@ class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
                     except Exception as e:
                         print(f"[UEFbxExporter] Failed to restore Local View: {e}")
 
+            record_history(prefs, export_stats, fbx_settings, use_stl)
+            if cache:
+                self.report({'INFO'}, cache.summary())
+                cache.evict()
+
             if exported_count == 0:
                 self.report({'ERROR'}, "No valid meshes found to export from the current selection.")
                 return {'CANCELLED'}
@@ -262,174 +451,151 @@ class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
 
         # Find parent dummy name for filename
         active = context.active_object
-        if active and active.parent:
-            base_name = active.parent.name
-        elif active:
-            base_name = active.name
-        else:
-            base_name = bpy.path.clean_name(bpy.path.display_name_from_filepath(bpy.data.filepath)) or "exported_scene"
+        base_name = export_base_name(active)
 
         # Ensure export_dir exists
-        os.makedirs(export_dir, exist_ok=True)
+        os.makedirs(write_dir, exist_ok=True)
         # Choose extension based on Shift (STL) or default (FBX)
         use_stl = getattr(self, "shift", False)
         ext = ".stl" if use_stl else ".fbx"
-        filepath = os.path.join(export_dir, f"{base_name}{ext}")
+        filepath = os.path.join(write_dir, f"{base_name}{ext}")
 
-        # --- Begin: Zero dummy location/rotation ---
         dummy = active.parent if active and active.parent else None
+        stats = RootStats(base_name)
+        memory = PeakMemorySampler()
+        memory.begin()
+        export_objects = list(context.selected_objects) + ([dummy] if dummy else [])
+        export_scene = ExportScene(export_objects, getattr(prefs, "isolate_evaluation", True))
+        export_scene.begin()
+
+        # --- Begin: Zero dummy location/rotation ---
         orig_loc = orig_rot = None
         if dummy:
             orig_loc = dummy.location.copy()
             orig_rot = dummy.rotation_euler.copy()
             dummy.location = (0.0, 0.0, 0.0)
             dummy.rotation_euler = (0.0, 0.0, 0.0)
-            bpy.context.view_layer.update()
+            export_scene.update()
         # --- End: Zero dummy location/rotation ---
 
-        # --- Robust geometry validation & force evaluation ---
-        bpy.context.view_layer.update()
-        depsgraph = bpy.context.evaluated_depsgraph_get()
-
-        def gather_candidate_mesh_objects():
-            sel_mesh = [o for o in context.selected_objects if o.type == 'MESH']
-            if sel_mesh:
-                return sel_mesh
-            # If no mesh directly selected, look at active object's children (one level)
-            if active:
-                child_mesh = [c for c in active.children if c.type == 'MESH']
-                if child_mesh:
-                    return child_mesh
-            return []
-
-        candidates = gather_candidate_mesh_objects()
-        valid_mesh_objects = []
-        problem_objects = []
-
-        # If still none, we cannot export
-        if not candidates:
-            # Restore dummy before cancelling
-            if dummy and orig_loc is not None and orig_rot is not None:
-                dummy.location = orig_loc
-                dummy.rotation_euler = orig_rot
-                bpy.context.view_layer.update()
-            self.report({'ERROR'}, "No mesh objects selected or in active hierarchy to export.")
-            return {'CANCELLED'}
+        with stats.phase("validate"):
+            # --- Robust geometry validation & force evaluation (the depsgraph is updated on access) ---
+            depsgraph = export_scene.depsgraph
+
+            def gather_candidate_mesh_objects():
+                sel_mesh = [o for o in context.selected_objects if o.type == 'MESH']
+                if sel_mesh:
+                    return sel_mesh
+                # If no mesh directly selected, look at active object's children (one level)
+                if active:
+                    child_mesh = [c for c in active.children if c.type == 'MESH']
+                    if child_mesh:
+                        return child_mesh
+                return []
+
+            candidates = gather_candidate_mesh_objects()
+            valid_mesh_objects = []
+            problem_objects = []
+
+            # If still none, we cannot export
+            if not candidates:
+                # Restore dummy before cancelling
+                if dummy and orig_loc is not None and orig_rot is not None:
+                    dummy.location = orig_loc
+                    dummy.rotation_euler = orig_rot
+                    export_scene.update()
+                memory.end()
+                export_scene.end()
+                self.report({'ERROR'}, "No mesh objects selected or in active hierarchy to export.")
+                return {'CANCELLED'}
 
-        for obj in candidates:
-            if not obj.visible_get():
-                continue
-            eval_obj = obj.evaluated_get(depsgraph)
-            tmp_mesh = None
-            try:
-                # Try evaluated mesh (modifiers applied in depsgraph)
-                try:
-                    tmp_mesh = eval_obj.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
-                except TypeError:
-                    # Fallback for older Blender versions
-                    tmp_mesh = eval_obj.to_mesh()
-                if not tmp_mesh or len(tmp_mesh.vertices) == 0 or len(tmp_mesh.polygons) == 0:
-                    problem_objects.append(obj.name)
-                else:
-                    valid_mesh_objects.append(obj)
-            except Exception as e:
-                problem_objects.append(f"{obj.name} (err: {e})")
-            finally:
-                if eval_obj and tmp_mesh:
-                    eval_obj.to_mesh_clear()
-
-        if not valid_mesh_objects:
-            # Attempt a final forced update (some modifiers update only after tag)
-            for o in candidates:
-                if o.type == 'MESH' and o.data:
-                    o.data.update()
-            bpy.context.view_layer.update()
-
-            # Re-check one more time quickly
-            retry_valid = False
             for obj in candidates:
-                if obj.type != 'MESH':
+                if not obj.visible_get():
                     continue
                 eval_obj = obj.evaluated_get(depsgraph)
                 tmp_mesh = None
                 try:
+                    # Try evaluated mesh (modifiers applied in depsgraph)
                     try:
                         tmp_mesh = eval_obj.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
                     except TypeError:
+                        # Fallback for older Blender versions
                         tmp_mesh = eval_obj.to_mesh()
-                    if tmp_mesh and len(tmp_mesh.polygons) > 0 and len(tmp_mesh.vertices) > 0:
-                        retry_valid = True
-                        break
+                    if not tmp_mesh or len(tmp_mesh.vertices) == 0 or len(tmp_mesh.polygons) == 0:
+                        problem_objects.append(obj.name)
+                    else:
+                        valid_mesh_objects.append(obj)
+                except Exception as e:
+                    problem_objects.append(f"{obj.name} (err: {e})")
                 finally:
                     if eval_obj and tmp_mesh:
                         eval_obj.to_mesh_clear()
 
-            if not retry_valid:
-                if dummy and orig_loc is not None and orig_rot is not None:
-                    dummy.location = orig_loc
-                    dummy.rotation_euler = orig_rot
-                    bpy.context.view_layer.update()
-                detail = ", ".join(problem_objects) if problem_objects else "No geometry produced"
-                self.report({'ERROR'}, f"Aborting export: no valid mesh geometry (0 faces). Problem objects: {detail}")
-                return {'CANCELLED'}
-
-        # Optional warning if some meshes were empty
-        if problem_objects:
-            self.report({'WARNING'}, f"Ignoring empty/invalid meshes: {', '.join(problem_objects)}")
-        # --------------------------------------------------------
+            if not valid_mesh_objects:
+                # Attempt a final forced update (some modifiers update only after tag)
+                for o in candidates:
+                    if o.type == 'MESH' and o.data:
+                        o.data.update()
+                export_scene.update()
+
+                # Re-check one more time quickly
+                retry_valid = False
+                for obj in candidates:
+                    if obj.type != 'MESH':
+                        continue
+                    eval_obj = obj.evaluated_get(depsgraph)
+                    tmp_mesh = None
+                    try:
+                        try:
+                            tmp_mesh = eval_obj.to_mesh(preserve_all_data_layers=True, depsgraph=depsgraph)
+                        except TypeError:
+                            tmp_mesh = eval_obj.to_mesh()
+                        if tmp_mesh and len(tmp_mesh.polygons) > 0 and len(tmp_mesh.vertices) > 0:
+                            retry_valid = True
+                            break
+                    finally:
+                        if eval_obj and tmp_mesh:
+                            eval_obj.to_mesh_clear()
+
+                if not retry_valid:
+                    if dummy and orig_loc is not None and orig_rot is not None:
+                        dummy.location = orig_loc
+                        dummy.rotation_euler = orig_rot
+                        export_scene.update()
+                    memory.end()
+                    export_scene.end()
+                    detail = ", ".join(problem_objects) if problem_objects else "No geometry produced"
+                    self.report({'ERROR'}, f"Aborting export: no valid mesh geometry (0 faces). Problem objects: {detail}")
+                    return {'CANCELLED'}
+
+            # Optional warning if some meshes were empty
+            if problem_objects:
+                self.report({'WARNING'}, f"Ignoring empty/invalid meshes: {', '.join(problem_objects)}")
+            # --------------------------------------------------------
+            stats.add_mesh_counts(valid_mesh_objects, depsgraph)
 
         try:
-            if getattr(self, "shift", False): 
-                bpy.ops.export_mesh.stl(
-                    filepath=filepath.replace('.fbx', '.stl'),
-                    use_selection=True,
-                    global_scale=1.0,
-                    ascii=False,
-                    use_mesh_modifiers=True,
-                    batch_mode='OFF',
-                    axis_forward='Y',
-                    axis_up='Z'
-                )
+            exported_meshes = [o for o in context.selected_objects if o.type == 'MESH' and o.visible_get()]
+            report = export_root(
+                stats, filepath, use_stl, fbx_settings, exported_meshes, export_scene, stages, cache,
+                root=dummy, prefs=prefs,
+            )
+            for line in report:
+                self.report({'INFO'}, line)
+            if staged:
+                msg = f"Exported {os.path.basename(filepath)}, uploading to {export_dir}"
+            elif use_stl:
                 msg = f"Exporting STL to {filepath}"
             else:
-                bpy.ops.export_scene.fbx(
-                    filepath=filepath,
-                    use_selection=True,
-                    check_existing=False,
-                    filter_glob="*.fbx",
-                    use_active_collection=False,
-                    global_scale=1.0,
-                    apply_unit_scale=True,
-                    apply_scale_options='FBX_SCALE_NONE',
-                    bake_space_transform=False,
-                    object_types={'ARMATURE', 'MESH', 'OTHER'},
-                    use_mesh_modifiers=True,
-                    use_mesh_modifiers_render=True,
-                    mesh_smooth_type=prefs.mesh_smooth_type,
-                    use_subsurf=False,
-                    use_mesh_edges=False,
-                    use_tspace=False,
-                    use_custom_props=False,
-                    add_leaf_bones=True,
-                    primary_bone_axis='Y',
-                    secondary_bone_axis='X',
-                    use_armature_deform_only=False,
-                    path_mode='AUTO',
-                    embed_textures=False,
-                    batch_mode='OFF',
-                    use_batch_own_dir=True,
-                    use_metadata=True,
-                    use_triangles=True,
-                    axis_forward='Y',
-                    axis_up='Z'
-                )
                 msg = f"Exported FBX to {filepath}"
         finally:
+            memory.end()
+            export_scene.end()
             # --- Restore dummy location/rotation ---
             if dummy and orig_loc is not None and orig_rot is not None:
                 dummy.location = orig_loc
                 dummy.rotation_euler = orig_rot
-                bpy.context.view_layer.update()
+                export_scene.update()
 
             # --- New: Restore Local View if it was active ---
             if local_view_active and view3d_override:
@@ -456,6 +622,15 @@ class OBJECT_OT_ExportUEFbx(bpy.types.Operator):
                 except Exception as e:
                     print(f"[UEFbxExporter] Failed to restore Local View: {e}")
 
+        stats.peak_memory = memory.delta
+        stats.finish(filepath.replace('.fbx', '.stl') if use_stl else filepath)
+        # After finish: the upload moves the staged file away
+        if staged:
+            upload_queue.upload_outputs(filepath, export_dir, detects_instances(prefs, use_stl))
+        record_history(prefs, [stats], fbx_settings, use_stl)
+        if cache:
+            cache.evict()
+
         self.report({'INFO'}, msg)
         return {'FINISHED'}
 
@@ -0,0 +1,158 @@
+import bpy
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import time
+
+# ------------------------------
+# Export history database
+# ------------------------------
+
+DB_NAME = "export_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS exports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    asset TEXT NOT NULL,
+    filepath TEXT,
+    file_size INTEGER,
+    vertices INTEGER,
+    triangles INTEGER,
+    total_time REAL,
+    phases TEXT,
+    peak_memory INTEGER,
+    estimated_memory INTEGER,
+    settings_hash TEXT,
+    blender_version TEXT
+);
+CREATE INDEX IF NOT EXISTS exports_asset ON exports (asset, id);
+"""
+
+# Panel queries are cached here and dropped whenever new records are written
+_query_cache = {}
+
+
+def db_path():
+    config_dir = bpy.utils.user_resource('CONFIG', path="UEFbxExporter", create=True)
+    return os.path.join(config_dir, DB_NAME)
+
+
+def connect():
+    con = sqlite3.connect(db_path(), timeout=5.0)
+    con.executescript(SCHEMA)
+    return con
+
+
+def settings_hash(settings):
+    """Short stable hash of the exporter settings dict"""
+    blob = json.dumps(settings, sort_keys=True, default=sorted)
+    return hashlib.sha1(blob.encode('utf-8')).hexdigest()[:12]
+
+
+def record_exports(stats, settings_key):
+    """Append one record per exported root. Never raises: history must not break an export."""
+    if not stats:
+        return
+    rows = [
+        (
+            time.time(),
+            s.name,
+            s.filepath,
+            s.file_size,
+            s.vertices,
+            s.triangles,
+            s.total_time,
+            json.dumps({k: round(v, 6) for k, v in s.phases.items()}),
+            s.peak_memory,
+            s.estimated_memory,
+            settings_key,
+            bpy.app.version_string,
+        )
+        for s in stats
+    ]
+    try:
+        # closing() closes the connection, the inner block commits or rolls back
+        with contextlib.closing(connect()) as con, con:
+            con.executemany(
+                "INSERT INTO exports (timestamp, asset, filepath, file_size, vertices, triangles, total_time,"
+                " phases, peak_memory, estimated_memory, settings_hash, blender_version)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    except (sqlite3.Error, OSError) as e:
+        print(f"[UEFbxExporter] Failed to write export history: {e}")
+    _query_cache.clear()
+
+
+def _cached(key, query):
+    if key not in _query_cache:
+        try:
+            con = connect()
+            try:
+                _query_cache[key] = query(con)
+            finally:
+                con.close()
+        except (sqlite3.Error, OSError) as e:
+            print(f"[UEFbxExporter] Failed to read export history: {e}")
+            _query_cache[key] = []
+    return _query_cache[key]
+
+
+def slowest_assets(limit=5):
+    """[(asset, total_time)] of the most recent export of each asset, slowest first"""
+    def query(con):
+        return con.execute(
+            "SELECT asset, total_time FROM exports WHERE id IN (SELECT MAX(id) FROM exports GROUP BY asset)"
+            " ORDER BY total_time DESC LIMIT ?",
+            (limit,),
+        ).fetchall()
+    return _cached(("slowest", limit), query)
+
+
+def regressions(threshold_pct, window=5):
+    """[(asset, latest_time, median_time, rise_pct)] for assets whose latest export time rose
+    more than `threshold_pct` percent over the median of their previous `window` exports"""
+    def query(con):
+        rows = con.execute(
+            "SELECT asset, total_time FROM ("
+            " SELECT asset, total_time, ROW_NUMBER() OVER (PARTITION BY asset ORDER BY id DESC) AS n"
+            " FROM exports) WHERE n <= ? ORDER BY asset, n",
+            (window + 1,),
+        ).fetchall()
+        history = {}
+        for asset, total_time in rows:
+            history.setdefault(asset, []).append(total_time)
+
+        flagged = []
+        for asset, times in history.items():
+            latest, previous = times[0], times[1:]
+            if not previous:
+                continue
+            median = statistics.median(previous)
+            if median <= 0.0:
+                continue
+            rise = (latest - median) / median * 100.0
+            if rise > threshold_pct:
+                flagged.append((asset, latest, median, rise))
+        flagged.sort(key=lambda r: r[3], reverse=True)
+        return flagged
+    return _cached(("regressions", round(threshold_pct, 3), window), query)
+
+
+def memory_overhead(default, samples=50):
+    """Median ratio of measured peak memory to the raw mesh size behind the estimate over the last
+    `samples` exports, or `default` when there is no usable history yet"""
+    def query(con):
+        return con.execute(
+            "SELECT peak_memory, estimated_memory FROM exports"
+            " WHERE peak_memory > 0 AND estimated_memory > 0 ORDER BY id DESC LIMIT ?",
+            (samples,),
+        ).fetchall()
+    rows = _cached(("overhead", samples), query)
+    if len(rows) < 3:
+        return default
+    return statistics.median(peak / estimated for peak, estimated in rows)
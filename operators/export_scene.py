@@ -0,0 +1,148 @@
+import bpy
+from contextlib import nullcontext
+
+# ------------------------------
+# Isolated evaluation
+# ------------------------------
+#
+# The exported hierarchy is linked into a temporary scene together with every
+# object it depends on (parents, modifier and constraint targets, driver
+# targets, instanced collections). Evaluating that scene's view layer only
+# evaluates those objects, instead of the whole view layer the user works in,
+# and the FBX writer runs against it through a context override. Objects are
+# linked, not copied: nothing is duplicated and removing the scene unlinks them.
+
+SCENE_NAME = "UEFbxExporter Export"
+
+
+def _pointer_targets(owner):
+    """Objects and collections referenced by the pointer properties of a modifier/constraint"""
+    for prop in owner.bl_rna.properties:
+        if prop.type != 'POINTER':
+            continue
+        value = getattr(owner, prop.identifier, None)
+        if isinstance(value, (bpy.types.Object, bpy.types.Collection)):
+            yield value
+    # Geometry Nodes inputs
+    if hasattr(owner, "keys"):
+        for key in owner.keys():
+            value = owner[key]
+            if isinstance(value, (bpy.types.Object, bpy.types.Collection)):
+                yield value
+
+
+def direct_dependencies(obj):
+    deps = []
+    if obj.parent:
+        deps.append(obj.parent)
+    for mod in obj.modifiers:
+        deps.extend(_pointer_targets(mod))
+    for con in obj.constraints:
+        deps.extend(_pointer_targets(con))
+    if obj.animation_data:
+        for fcurve in obj.animation_data.drivers:
+            for var in fcurve.driver.variables:
+                for target in var.targets:
+                    if isinstance(target.id, bpy.types.Object):
+                        deps.append(target.id)
+    if obj.instance_type == 'COLLECTION' and obj.instance_collection:
+        deps.append(obj.instance_collection)
+    return deps
+
+
+def dependency_closure(objects):
+    """`objects` and everything their evaluation depends on"""
+    found = {}
+    stack = list(objects)
+    while stack:
+        item = stack.pop()
+        if isinstance(item, bpy.types.Collection):
+            stack.extend(item.all_objects)
+            continue
+        if item.name_full in found:
+            continue
+        found[item.name_full] = item
+        stack.extend(direct_dependencies(item))
+    return list(found.values())
+
+
+class ExportScene:
+    """Evaluation context of one export: begin(), use `depsgraph` / `override()`, always end().
+
+    Disabled, it stands for the current scene and view layer, so callers have one code path.
+    """
+
+    def __init__(self, objects, enabled=True):
+        self.objects = list(objects)
+        self.enabled = enabled
+        self.scene = None
+        self.view_layer = None
+
+    def begin(self):
+        if not self.enabled:
+            return
+        source = bpy.context.scene
+        selected = {o.name_full for o in bpy.context.selected_objects}
+        active = bpy.context.view_layer.objects.active
+
+        scene = bpy.data.scenes.new(SCENE_NAME)
+        # apply_unit_scale reads the scene units
+        scene.unit_settings.system = source.unit_settings.system
+        scene.unit_settings.scale_length = source.unit_settings.scale_length
+        scene.unit_settings.length_unit = source.unit_settings.length_unit
+        scene.frame_current = source.frame_current
+        for obj in dependency_closure(self.objects):
+            scene.collection.objects.link(obj)
+        self.scene = scene
+        self.view_layer = scene.view_layers[0]
+
+        # Mirror the selection the exporter set up; dependencies stay unselected
+        for obj in scene.objects:
+            obj.select_set(obj.name_full in selected, view_layer=self.view_layer)
+        if active and active in set(scene.objects):
+            self.view_layer.objects.active = active
+
+    @property
+    def depsgraph(self):
+        if not self.enabled:
+            return bpy.context.evaluated_depsgraph_get()
+        self.view_layer.update()
+        return self.view_layer.depsgraph
+
+    def update(self):
+        """Evaluate pending changes (e.g. a zeroed dummy) in the export view layer only. Disabled, the
+        current view layer is updated; after end() the user's view layer picks them up on its own"""
+        if not self.enabled:
+            bpy.context.view_layer.update()
+        elif self.view_layer is not None:
+            self.view_layer.update()
+
+    def override(self):
+        if not self.enabled:
+            return nullcontext()
+        return bpy.context.temp_override(scene=self.scene, view_layer=self.view_layer)
+
+    def sync_selection(self):
+        """Copy the current selection of the user's view layer into the export view layer"""
+        if not self.enabled:
+            return
+        selected = {o.name_full for o in bpy.context.selected_objects}
+        for obj in self.scene.objects:
+            obj.select_set(obj.name_full in selected, view_layer=self.view_layer)
+        active = bpy.context.view_layer.objects.active
+        if active and active in set(self.scene.objects):
+            self.view_layer.objects.active = active
+
+    def end(self):
+        if self.scene is not None:
+            bpy.data.scenes.remove(self.scene)
+            self.scene = None
+            self.view_layer = None
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
@@ -0,0 +1,143 @@
+import bpy
+import gc
+
+# ------------------------------
+# Export footprint estimation
+# ------------------------------
+
+# Bytes per element of each attribute data type
+ATTRIBUTE_SIZES = {
+    'FLOAT': 4,
+    'INT': 4,
+    'FLOAT_VECTOR': 12,
+    'FLOAT_COLOR': 16,
+    'BYTE_COLOR': 4,
+    'STRING': 8,
+    'BOOLEAN': 1,
+    'FLOAT2': 8,
+    'INT8': 1,
+    'INT32_2D': 8,
+    'QUATERNION': 16,
+    'FLOAT4X4': 64,
+}
+
+# How many copies of the evaluated mesh the FBX writer keeps alive at once
+# (to_mesh copy, triangulated BMesh, NumPy buffers). Replaced by the measured
+# ratio once the export history has enough samples.
+DEFAULT_OVERHEAD = 4.0
+
+
+def mesh_bytes(mesh):
+    """Rough in-memory size of a mesh from its element and attribute counts"""
+    domain_sizes = {
+        'POINT': len(mesh.vertices),
+        'EDGE': len(mesh.edges),
+        'FACE': len(mesh.polygons),
+        'CORNER': len(mesh.loops),
+    }
+    # Positions, corner vert/edge and face offsets
+    size = domain_sizes['POINT'] * 12 + domain_sizes['CORNER'] * 8 + domain_sizes['FACE'] * 8 + domain_sizes['EDGE'] * 8
+    for attr in mesh.attributes:
+        if attr.name == "position" or attr.name.startswith("."):
+            continue
+        size += domain_sizes.get(attr.domain, 0) * ATTRIBUTE_SIZES.get(attr.data_type, 4)
+    for uv_layer in mesh.uv_layers:
+        # UV maps are FLOAT2 corner attributes in 3.5+, only count them when they are not listed above
+        if uv_layer.name not in mesh.attributes:
+            size += domain_sizes['CORNER'] * 8
+    return size
+
+
+def mesh_footprint(objects, depsgraph):
+    """Raw evaluated mesh bytes of `objects`; multiply by the writer overhead for the export peak.
+    Without a depsgraph the source meshes are measured (modifier output not counted)."""
+    total = 0
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        total += mesh_bytes(obj.evaluated_get(depsgraph).data if depsgraph else obj.data)
+    return total
+
+# ------------------------------
+# Scheduling
+# ------------------------------
+
+def plan_chunks(estimates, budget):
+    """Split {root: estimated_bytes} into chunks whose summed estimate stays under `budget`.
+
+    First-fit decreasing packing keeps the chunk count low; chunks are then ordered
+    lightest first so a root that does blow the budget comes after everything else.
+    A budget of 0 disables chunking.
+    """
+    roots = list(estimates)
+    if budget <= 0:
+        return [roots] if roots else []
+
+    chunks = []
+    loads = []
+    for root in sorted(roots, key=lambda r: estimates[r], reverse=True):
+        size = estimates[root]
+        for i, load in enumerate(loads):
+            if load + size <= budget:
+                chunks[i].append(root)
+                loads[i] += size
+                break
+        else:
+            # Roots larger than the budget get a chunk of their own
+            chunks.append([root])
+            loads.append(size)
+
+    for chunk in chunks:
+        chunk.sort(key=lambda r: estimates[r])
+    chunks.sort(key=lambda c: estimates[c[-1]])
+    return chunks
+
+
+def schedule_roots(roots, objects_for_root, depsgraph, budget, overhead=DEFAULT_OVERHEAD):
+    """[(root, raw_mesh_bytes, starts_chunk)] in export order"""
+    footprints = {root: mesh_footprint(objects_for_root(root), depsgraph) for root in roots}
+    estimates = {root: int(size * overhead) for root, size in footprints.items()}
+    schedule = []
+    for chunk in plan_chunks(estimates, budget):
+        for i, root in enumerate(chunk):
+            schedule.append((root, footprints[root], i == 0))
+    return schedule
+
+
+# Meshes the exporter created; free_memory never touches the user's own orphan meshes
+_temporary_meshes = []
+
+
+def track_temporary(mesh):
+    """Register a mesh the exporter created, so free_memory can release it if it is left behind"""
+    _temporary_meshes.append(mesh)
+    return mesh
+
+
+def prune_temporary():
+    """Forget tracked meshes that were removed already (ExportSnapshot.restore removes its own)"""
+    alive = []
+    for mesh in _temporary_meshes:
+        try:
+            mesh.users
+        except ReferenceError:
+            continue
+        alive.append(mesh)
+    _temporary_meshes[:] = alive
+
+
+def free_memory():
+    """Release the exporter's temporary meshes left without users and collect Python garbage"""
+    orphans = []
+    in_use = []
+    for mesh in _temporary_meshes:
+        try:
+            (orphans if mesh.users == 0 else in_use).append(mesh)
+        except ReferenceError:
+            # Already removed by the snapshot
+            continue
+    _temporary_meshes[:] = in_use
+    if orphans:
+        bpy.data.batch_remove(orphans)
+    gc.collect()
+    return len(orphans)
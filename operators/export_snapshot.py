@@ -0,0 +1,231 @@
+import bpy
+import bmesh
+import numpy
+
+from . import export_scheduler
+from . import mesh_cache
+from . import instancing
+from . import merge_meshes
+from .mesh_arrays import MeshArrays
+
+# ------------------------------
+# Export snapshot
+# ------------------------------
+#
+# Evaluated, triangulated copies of the exported meshes that export stages may
+# rewrite freely. While the FBX writer runs, each copy is swapped into its object
+# with the object's modifiers muted, so the writer picks it up as-is and the
+# scene data itself is never touched.
+
+def snapshot_supported(obj):
+    """Skinned and shape-keyed meshes keep going through the writer untouched"""
+    if obj.type != 'MESH':
+        return False
+    if obj.data.shape_keys is not None:
+        return False
+    if obj.parent and obj.parent.type == 'ARMATURE':
+        return False
+    return not any(mod.type == 'ARMATURE' for mod in obj.modifiers)
+
+
+def triangulate(mesh):
+    """Triangulate like the FBX writer does (use_triangles), so the writer has nothing left to do"""
+    sizes = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    if numpy.all(sizes == 3):
+        return
+    bm = bmesh.new()
+    bm.from_mesh(mesh)
+    bmesh.ops.triangulate(bm, faces=bm.faces)
+    bm.to_mesh(mesh)
+    bm.free()
+
+
+class ExportSnapshot:
+    """Stage-processed evaluated meshes swapped into `objects` for one export:
+    build(), swap(), then always restore().
+
+    A stage is a callable `stage(snapshot, obj, arrays) -> arrays` working on MeshArrays;
+    it may append human readable lines to `snapshot.report` and accumulate per-root
+    counters in `snapshot.totals`. With a `cache` (MeshCache), meshes with modifiers
+    are read from the evaluated mesh cache instead of being evaluated. With `merge`,
+    all meshes are merged into one temporary object under the `root` dummy; with
+    `detect_instances`, repeated geometry is written once and the other copies are
+    listed in `instances`. With a `lightmap` (LightmapPacker), the written meshes get a
+    lightmap UV channel packed into one shared square.
+    """
+
+    def __init__(self, objects, depsgraph, stages, cache=None, root=None, merge=False, detect_instances=False,
+                 lightmap=None):
+        self.objects = [o for o in objects if snapshot_supported(o)]
+        self.depsgraph = depsgraph
+        self.stages = stages
+        self.cache = cache
+        self.root = root
+        self.merge = merge and root is not None and root.type == 'EMPTY'
+        self.detect_instances = detect_instances
+        self.lightmap = lightmap
+        # [(prototype, [(duplicate, matrix relative to root)])], filled by build()
+        self.instances = []
+        self._merged = None
+        self._merged_object = None
+        # Collection the merged object is linked to (default: the root's first collection)
+        self.collection = None
+        # Objects left out of the written file (merge sources, instance duplicates)
+        self._excluded = []
+        self._deselected = []
+        self.report = []
+        self.totals = {}
+        self._meshes = []
+        self._swapped = []
+
+    def _evaluate(self, obj):
+        eval_obj = obj.evaluated_get(self.depsgraph)
+        mesh = bpy.data.meshes.new_from_object(eval_obj, preserve_all_data_layers=True, depsgraph=self.depsgraph)
+        triangulate(mesh)
+        return export_scheduler.track_temporary(mesh)
+
+    def _cached_arrays(self, obj, key):
+        """Evaluated arrays from the mesh cache, evaluating and storing them on a miss"""
+        arrays = self.cache.load(key)
+        hit = arrays is not None
+        if not hit:
+            mesh = self._evaluate(obj)
+            arrays = MeshArrays.from_mesh(mesh)
+            bpy.data.meshes.remove(mesh)
+            self.cache.store(key, arrays)
+        counter = "mesh_cache_hits" if hit else "mesh_cache_misses"
+        self.totals[counter] = self.totals.get(counter, 0) + 1
+        return arrays
+
+    def build(self):
+        merging = self.merge and len(self.objects) > 1
+        instancing = self.detect_instances and len(self.objects) > 1
+        keep_arrays = merging or instancing or self.lightmap is not None
+        parts = []
+        for obj in self.objects:
+            key = None
+            if self.cache is not None and mesh_cache.cacheable(obj):
+                key = mesh_cache.cache_key(obj)
+            if key is not None:
+                arrays = self._cached_arrays(obj, key)
+            elif self.stages or keep_arrays:
+                mesh = self._evaluate(obj)
+                arrays = MeshArrays.from_mesh(mesh)
+                bpy.data.meshes.remove(mesh)
+            else:
+                self._meshes.append((obj, self._evaluate(obj)))
+                continue
+            arrays.name = obj.data.name
+            for stage in self.stages:
+                arrays = stage(self, obj, arrays)
+            if keep_arrays:
+                parts.append((obj, arrays))
+            else:
+                self._meshes.append((obj, export_scheduler.track_temporary(arrays.to_mesh())))
+        if merging:
+            self._merge(parts)
+            return
+        if instancing:
+            parts = self._find_instances(parts)
+        if self.lightmap is not None and parts:
+            self._add_lightmap([(arrays, numpy.array(obj.matrix_world)) for obj, arrays in parts])
+        for obj, arrays in parts:
+            self._meshes.append((obj, export_scheduler.track_temporary(arrays.to_mesh())))
+
+    def _root_matrix(self):
+        return numpy.array(self.root.matrix_world) if self.root is not None else numpy.eye(4)
+
+    def _find_instances(self, parts):
+        """Write repeated geometry once: duplicates are left out of the export"""
+        self.instances = instancing.find_instances(parts, self._root_matrix())
+        duplicates = {obj for _, members in self.instances for obj, _ in members}
+        self._excluded = list(duplicates)
+        if self.instances:
+            self.report.append(
+                f"{len(duplicates)} duplicate meshes of {len(self.instances)} geometries exported as instances"
+            )
+        return [(obj, arrays) for obj, arrays in parts if obj not in duplicates]
+
+    def _add_lightmap(self, parts):
+        """Pack a lightmap UV channel for `parts` [(arrays, 4x4 matrix to world)] together"""
+        scales = [abs(numpy.linalg.det(matrix[:3, :3])) ** (1.0 / 3.0) for _, matrix in parts]
+        charts, coverage = self.lightmap.apply([(arrays, scale) for (arrays, _), scale in zip(parts, scales)])
+        name = self.root.name if self.root is not None else parts[0][0].name
+        self.report.append(
+            f"{name}: lightmap UVs in '{self.lightmap.uv_name}', {charts} charts covering {coverage:.0%}"
+        )
+
+    def _merge(self, parts):
+        """One mesh in the space of the root dummy from the arrays of all objects"""
+        root = self.root
+        root_inverse = numpy.linalg.inv(self._root_matrix())
+        merged = merge_meshes.merge_arrays(
+            [
+                (
+                    arrays,
+                    root_inverse @ numpy.array(obj.matrix_world),
+                    [slot.material for slot in obj.material_slots],
+                    [uv.name for uv in obj.data.uv_layers],
+                )
+                for obj, arrays in parts
+            ],
+            f"{root.name}_Merged",
+        )
+        if self.lightmap is not None:
+            self._add_lightmap([(merged, self._root_matrix())])
+        self._merged = export_scheduler.track_temporary(merged.to_mesh())
+        self._excluded = [obj for obj, _ in parts]
+        self.report.append(
+            f"{root.name}: merged {len(parts)} meshes into one "
+            f"({merged.vertex_count} vertices, {len(merged.materials)} material slots)"
+        )
+
+    def swap(self):
+        self._deselected = [o for o in self._excluded if o.select_get()]
+        for o in self._deselected:
+            o.select_set(False)
+        if self._merged is not None:
+            self._swap_merged()
+        for obj, mesh in self._meshes:
+            modifiers = [(mod, mod.show_viewport, mod.show_render) for mod in obj.modifiers]
+            self._swapped.append((obj, obj.data, modifiers))
+            for mod, _, _ in modifiers:
+                mod.show_viewport = False
+                mod.show_render = False
+            obj.data = mesh
+
+    def _swap_merged(self):
+        """Export a temporary object holding the merged mesh instead of its sources"""
+        mesh = self._merged
+        root = self.root
+        obj = bpy.data.objects.new(mesh.name, mesh)
+        collection = self.collection
+        if collection is None:
+            collection = root.users_collection[0] if root.users_collection else bpy.context.scene.collection
+        collection.objects.link(obj)
+        obj.parent = root
+        # matrix_parent_inverse stays identity: the mesh is already in root space
+        self._merged_object = obj
+        obj.select_set(True)
+
+    def restore(self):
+        if self._merged_object is not None:
+            bpy.data.objects.remove(self._merged_object)
+            self._merged_object = None
+        if self._merged is not None:
+            bpy.data.meshes.remove(self._merged)
+            self._merged = None
+        for o in self._deselected:
+            o.select_set(True)
+        self._deselected = []
+        for obj, data, modifiers in reversed(self._swapped):
+            obj.data = data
+            for mod, show_viewport, show_render in modifiers:
+                mod.show_viewport = show_viewport
+                mod.show_render = show_render
+        self._swapped.clear()
+        for _, mesh in self._meshes:
+            bpy.data.meshes.remove(mesh)
+        self._meshes.clear()
+        export_scheduler.prune_temporary()
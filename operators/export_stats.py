@@ -0,0 +1,158 @@
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# ------------------------------
+# Process memory probes
+# ------------------------------
+
+def _windows_memory():
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return 0, 0
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def _proc_status_memory():
+    current = peak = 0
+    with open("/proc/self/status", "rt") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                current = int(line.split()[1]) * 1024
+            elif line.startswith("VmHWM:"):
+                peak = int(line.split()[1]) * 1024
+    return current, peak
+
+
+def _rusage_memory():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    if sys.platform != 'darwin':
+        peak *= 1024
+    return peak, peak
+
+
+def process_memory():
+    """Return (current, peak) resident memory of this process in bytes, (0, 0) if unknown"""
+    try:
+        if os.name == 'nt':
+            return _windows_memory()
+        if os.path.exists("/proc/self/status"):
+            return _proc_status_memory()
+        return _rusage_memory()
+    except Exception:
+        return 0, 0
+
+
+class PeakMemorySampler:
+    """Sample resident memory on a background thread to get the peak of a single block of work.
+
+    The process-wide high-water mark never goes down, so it can't tell one root from the next.
+    """
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.start = 0
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, process_memory()[0])
+
+    def begin(self):
+        self.start = self.peak = process_memory()[0]
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="UEFbxExporterMemory", daemon=True)
+        self._thread.start()
+
+    def end(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.peak = max(self.peak, process_memory()[0])
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+    @property
+    def delta(self):
+        """Peak memory above what the process used when sampling started"""
+        return max(0, self.peak - self.start)
+
+# ------------------------------
+# Per-root export statistics
+# ------------------------------
+
+class RootStats:
+    """Timings and sizes gathered while exporting one root hierarchy"""
+
+    def __init__(self, name):
+        self.name = name
+        self.filepath = ""
+        self.file_size = 0
+        self.vertices = 0
+        self.triangles = 0
+        self.peak_memory = 0
+        # Raw mesh bytes the scheduler based its estimate on (before overhead)
+        self.estimated_memory = 0
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def total_time(self):
+        return sum(self.phases.values())
+
+    def add_mesh_counts(self, objects, depsgraph):
+        """Accumulate evaluated vertex/triangle counts of the mesh objects in `objects`"""
+        for obj in objects:
+            if obj.type != 'MESH':
+                continue
+            mesh = obj.evaluated_get(depsgraph).data
+            self.vertices += len(mesh.vertices)
+            # An n-gon always triangulates into n - 2 triangles
+            self.triangles += len(mesh.loops) - 2 * len(mesh.polygons)
+
+    def finish(self, filepath):
+        self.filepath = filepath
+        try:
+            self.file_size = os.path.getsize(filepath)
+        except OSError:
+            self.file_size = 0
@@ -0,0 +1,131 @@
+"""Background export worker.
+
+Started by worker_pool.py as
+    blender -b <file.blend> --python export_worker.py -- --token <token>
+It binds a localhost port, prints it on stdout and then serves JSON-line commands:
+    {"token": ..., "command": "ping"}
+    {"token": ..., "command": "export", "roots": [...], "export_dir": ..., "prefs": {...}}
+    {"token": ..., "command": "quit"}
+Every reply is one JSON line. The worker keeps the .blend loaded between commands,
+so exports skip Blender startup, addon registration and file loading.
+"""
+import bpy
+import importlib
+import json
+import socket
+import sys
+import time
+
+ADDON = "UEFbxExporter"
+PORT_PREFIX = "UEFBX_WORKER_PORT"
+
+
+def _arguments():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    args = {}
+    for key, value in zip(argv[::2], argv[1::2]):
+        args[key.lstrip("-")] = value
+    return args
+
+
+def apply_prefs(values):
+    addon = bpy.context.preferences.addons.get(ADDON)
+    if addon is None:
+        return
+    prefs = addon.preferences
+    for key, value in values.items():
+        try:
+            setattr(prefs, key, value)
+        except (AttributeError, TypeError, ValueError):
+            pass
+    # Uploads are the client's business, a worker writes in place
+    if hasattr(prefs, "stage_exports"):
+        prefs.stage_exports = 'NEVER'
+
+
+def export_roots(message):
+    apply_prefs(message.get("prefs", {}))
+    addon = bpy.context.preferences.addons.get(ADDON)
+    if addon is None:
+        return {"ok": False, "error": f"{ADDON} is not enabled in the worker"}
+    prefs = addon.preferences
+    export_fbx = importlib.import_module(f"{ADDON}.operators.export_fbx")
+    # Every root goes through the exporter's multi-root path, so a background export
+    # writes the same files as a foreground one: named after the root, root zeroed
+    roots = [bpy.data.objects.get(name) for name in message["roots"]]
+    settings = export_fbx.fbx_export_settings(prefs)
+    stages = export_fbx.snapshot_stages(prefs, [r for r in roots if r is not None])
+    cache = export_fbx.make_mesh_cache(prefs)
+    isolate = getattr(prefs, "isolate_evaluation", True)
+    export_dir = message["export_dir"]
+    results = []
+    export_stats = []
+    for name, root in zip(message["roots"], roots):
+        if root is None:
+            results.append({"root": name, "ok": False, "error": "not in the worker's file"})
+            continue
+        start = time.perf_counter()
+        ok, error, filepath = False, None, None
+        try:
+            result = export_fbx.export_hierarchy(
+                bpy.context, root, export_dir, False, settings, stages, cache, prefs, isolate,
+            )
+            if result is None:
+                error = "no mesh with faces in the hierarchy"
+            else:
+                stats, filepath, _ = result
+                export_stats.append(stats)
+                ok = True
+        except Exception as e:
+            error = str(e)
+        results.append({
+            "root": name,
+            "ok": ok,
+            "error": error,
+            "file": filepath,
+            "time": time.perf_counter() - start,
+        })
+    if cache:
+        cache.evict()
+    export_fbx.record_history(prefs, export_stats, settings, False)
+    return {"ok": all(r["ok"] for r in results), "results": results}
+
+
+def handle(message, token):
+    if message.get("token") != token:
+        return {"ok": False, "error": "bad token"}
+    command = message.get("command")
+    if command == "ping":
+        return {"ok": True, "file": bpy.data.filepath}
+    if command == "export":
+        return export_roots(message)
+    if command == "quit":
+        return {"ok": True}
+    return {"ok": False, "error": f"unknown command {command!r}"}
+
+
+def serve(token):
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    print(f"{PORT_PREFIX} {server.getsockname()[1]}", flush=True)
+    while True:
+        conn, _ = server.accept()
+        with conn, conn.makefile("rwb") as stream:
+            line = stream.readline()
+            if not line:
+                continue
+            try:
+                message = json.loads(line)
+                reply = handle(message, token)
+            except Exception as e:
+                message, reply = {}, {"ok": False, "error": str(e)}
+            stream.write(json.dumps(reply).encode("utf-8") + b"\n")
+            stream.flush()
+        if message.get("command") == "quit" and message.get("token") == token:
+            break
+    server.close()
+
+
+if __name__ == "__main__":
+    serve(_arguments().get("token", ""))
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import numpy
+
+# ------------------------------
+# Instance detection
+# ------------------------------
+#
+# Meshes that are the same geometry under a rigid transform and uniform scale
+# are written once; the other copies go to a side-car JSON file as transforms
+# of the written prototype. The canonical frame of a mesh is built from its own
+# vertices in index order (centroid, then the first vertex far from it, then the
+# first vertex far from that axis), so copies made with duplicate / linked
+# duplicate / array-apply land in the same frame even when the shape is
+# symmetric, and their quantized canonical positions hash identically.
+# Matching is per exported asset: copies in different roots are each written
+# in full. Mirrored copies (negative scale) are not matched either, since the
+# canonical frame is always right-handed and a reflection lands in another one.
+
+QUANTIZATION = 1e-4
+SIDECAR_SUFFIX = ".instances.json"
+
+
+def canonical_frame(positions):
+    """(center, rotation rows, radius) of the canonical frame, None for degenerate (flat-line/point) meshes"""
+    p = positions.astype(numpy.float64)
+    if len(p) < 3:
+        return None
+    center = p.mean(axis=0)
+    d = p - center
+    radius = numpy.linalg.norm(d, axis=1)
+    max_radius = radius.max()
+    if max_radius == 0.0:
+        return None
+    a = int(numpy.argmax(radius > 0.5 * max_radius))
+    x = d[a] / radius[a]
+    orth = d - numpy.outer(d @ x, x)
+    orth_length = numpy.linalg.norm(orth, axis=1)
+    if orth_length.max() < 1e-6 * max_radius:
+        return None
+    b = int(numpy.argmax(orth_length > 0.5 * orth_length.max()))
+    y = orth[b] / orth_length[b]
+    return center, numpy.stack((x, y, numpy.cross(x, y))), max_radius
+
+
+def frame_matrix(frame):
+    """4x4 matrix mapping canonical coordinates to mesh-local ones"""
+    center, rotation, radius = frame
+    matrix = numpy.eye(4)
+    matrix[:3, :3] = rotation.T * radius
+    matrix[:3, 3] = center
+    return matrix
+
+
+def geometry_fingerprint(arrays, frame, material_names):
+    """Hash of canonical positions, topology, attributes and materials"""
+    center, rotation, radius = frame
+    canonical = (arrays.positions.astype(numpy.float64) - center) @ rotation.T / radius
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(numpy.round(canonical / QUANTIZATION).astype(numpy.int64).data)
+    for values in (arrays.corner_verts, arrays.face_sizes):
+        digest.update(numpy.ascontiguousarray(values).data)
+    for name in sorted(arrays.attributes):
+        domain, data_type, values = arrays.attributes[name]
+        if data_type == 'FLOAT_VECTOR':
+            # Directions rotate with the instance
+            continue
+        digest.update(f"{name}:{domain}:{data_type}".encode('utf-8'))
+        digest.update(numpy.ascontiguousarray(values).data)
+    digest.update(json.dumps(material_names).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def find_instances(parts, root_matrix):
+    """Group `parts` [(obj, arrays)] by geometry.
+
+    Returns [(prototype obj, [(duplicate obj, 4x4 matrix placing the prototype's mesh, relative to
+    `root_matrix`)])] for every geometry used more than once.
+    """
+    root_inverse = numpy.linalg.inv(root_matrix)
+    groups = {}
+    for obj, arrays in parts:
+        frame = canonical_frame(arrays.positions)
+        if frame is None:
+            continue
+        materials = [slot.material.name if slot.material else None for slot in obj.material_slots]
+        key = geometry_fingerprint(arrays, frame, materials)
+        groups.setdefault(key, []).append((obj, frame_matrix(frame)))
+
+    instances = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        prototype, prototype_frame = members[0]
+        to_prototype = numpy.linalg.inv(prototype_frame)
+        duplicates = [
+            (obj, root_inverse @ numpy.array(obj.matrix_world) @ frame @ to_prototype)
+            for obj, frame in members[1:]
+        ]
+        instances.append((prototype, duplicates))
+    return instances
+
+
+def sidecar_path(filepath):
+    return os.path.splitext(filepath)[0] + SIDECAR_SUFFIX
+
+
+def write_sidecar(filepath, root_name, instances):
+    """Write the instance transforms next to `filepath`; a stale side-car is removed when there are none"""
+    path = sidecar_path(filepath)
+    if not instances:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+    data = {
+        "asset": root_name,
+        "file": os.path.basename(filepath),
+        "space": "Blender units and axes, relative to the asset root",
+        "prototypes": [
+            {
+                "object": prototype.name,
+                "instances": [
+                    {"object": obj.name, "matrix": [round(float(v), 6) for v in matrix.ravel()]}
+                    for obj, matrix in duplicates
+                ],
+            }
+            for prototype, duplicates in instances
+        ],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    return path
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import numpy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .mesh_arrays import fingerprint
+from .mesh_topology import connected_components, face_normals, face_pairs
+
+# ------------------------------
+# Lightmap UVs
+# ------------------------------
+#
+# Builds a non-overlapping lightmap UV channel for every exported mesh so UE can
+# use it as is instead of generating one on import. Faces are split into charts
+# by their dominant axis (box projection) and by an angle limit between
+# neighbours, each chart is projected on its axis plane, and the charts of all
+# meshes written to one file are shelf-packed together into the 0-1 square with
+# a padding in lightmap texels: UE combines the meshes of a file into one static
+# mesh, so their lightmap charts must not overlap either. Segmentation is cached
+# per mesh fingerprint and run for a whole asset at once in a thread pool (the
+# NumPy kernels release the GIL); packing only moves chart rectangles.
+
+ANGLE_LIMIT = numpy.radians(66.0)
+CACHE_SIZE = 64
+
+# Per dominant axis (+X, -X, +Y, -Y, +Z, -Z): (U, V) plane axes, right handed around the normal
+PROJECTION_AXES = numpy.array([
+    [[0, 1, 0], [0, 0, 1]],
+    [[0, -1, 0], [0, 0, 1]],
+    [[-1, 0, 0], [0, 0, 1]],
+    [[1, 0, 0], [0, 0, 1]],
+    [[1, 0, 0], [0, 1, 0]],
+    [[-1, 0, 0], [0, 1, 0]],
+], dtype=numpy.float64)
+
+# fingerprint -> (corner chart (L,), chart-local corner UVs (L, 2), chart sizes (C, 2))
+_charts = OrderedDict()
+# digest of the packed meshes and settings -> ([corner UVs (L, 2) per mesh], coverage)
+_layouts = OrderedDict()
+_executor = None
+
+
+def _remember(cache, key, value):
+    cache[key] = value
+    while len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def segment_charts(arrays):
+    """Split the faces of `arrays` into charts and project them.
+
+    Returns (chart of every corner, chart-local corner UVs with every chart's lower left corner
+    at the origin, (C, 2) chart sizes) in mesh units. Charts are turned so they are wider than tall.
+    """
+    normals = face_normals(arrays)
+    axis = numpy.argmax(numpy.abs(normals), axis=1)
+    direction = axis * 2 + (normals[numpy.arange(len(axis)), axis] < 0.0)
+
+    pairs, _ = face_pairs(arrays)
+    cos = numpy.einsum('ij,ij->i', normals[pairs[:, 0]], normals[pairs[:, 1]])
+    joined = (direction[pairs[:, 0]] == direction[pairs[:, 1]]) & (cos >= numpy.cos(ANGLE_LIMIT))
+    face_chart, chart_count = connected_components(arrays.face_count, pairs[joined])
+
+    corner_face = arrays.face_corners()
+    corner_chart = face_chart[corner_face]
+    planes = PROJECTION_AXES[direction[corner_face]]
+    points = arrays.positions.astype(numpy.float64)[arrays.corner_verts]
+    uvs = numpy.einsum('lj,lkj->lk', points, planes)
+
+    low = numpy.full((chart_count, 2), numpy.inf)
+    high = numpy.full((chart_count, 2), -numpy.inf)
+    numpy.minimum.at(low, corner_chart, uvs)
+    numpy.maximum.at(high, corner_chart, uvs)
+    uvs -= low[corner_chart]
+    sizes = high - low
+
+    # Quarter turn for charts taller than wide, so shelves stay flat
+    tall = sizes[:, 1] > sizes[:, 0]
+    turned = tall[corner_chart]
+    uvs[turned] = numpy.stack((uvs[turned, 1], sizes[corner_chart[turned], 0] - uvs[turned, 0]), axis=1)
+    sizes[tall] = sizes[tall][:, ::-1]
+    return corner_chart, uvs, sizes
+
+
+def cached_charts(arrays):
+    key = fingerprint(arrays)
+    if key in _charts:
+        _charts.move_to_end(key)
+        return key, _charts[key], True
+    return key, None, False
+
+
+def shelf_pack(sizes, margin, width):
+    """Lower left corner of every rectangle of `sizes`, packed in shelves `width` wide with `margin`
+    around each one, tallest first. Returns (corners (N, 2), packed width, packed height)."""
+    order = numpy.argsort(-sizes[:, 1], kind='stable')
+    w = sizes[order, 0]
+    h = sizes[order, 1]
+    x_end = numpy.cumsum(w + margin)
+    corners = numpy.empty((len(sizes), 2))
+    y = margin
+    extent = 0.0
+    start = 0
+    while start < len(order):
+        base = x_end[start - 1] if start else 0.0
+        end = max(int(numpy.searchsorted(x_end, base + width - margin, side='right')), start + 1)
+        row = order[start:end]
+        corners[row, 0] = x_end[start:end] - w[start:end] - base
+        corners[row, 1] = y
+        extent = max(extent, margin + x_end[end - 1] - base)
+        # Sorted tallest first: the first rectangle sets the shelf height
+        y += h[start] + margin
+        start = end
+    return corners, extent, y
+
+
+def pack_charts(sizes, margin_uv, steps=24):
+    """(corners (N, 2), scale) placing charts of `sizes` in the 0-1 square, `margin_uv` apart.
+
+    The margin is fixed in UV space, so its size in mesh units depends on the scale: the largest
+    scale whose packing still fits is found by bisection.
+    """
+    area = float(numpy.sum(sizes[:, 0] * sizes[:, 1]))
+    if len(sizes) == 0 or area <= 0.0:
+        return numpy.zeros((len(sizes), 2)), 1.0
+
+    def pack(scale):
+        margin = margin_uv / scale
+        width = numpy.sqrt(numpy.sum((sizes[:, 0] + margin) * (sizes[:, 1] + margin)))
+        width = max(width, float(sizes[:, 0].max()) + 2.0 * margin)
+        corners, packed_width, packed_height = shelf_pack(sizes, margin, width)
+        return corners, scale * max(packed_width, packed_height)
+
+    # Charts filling the square without any gap bound the scale from above
+    low, high = 0.0, 1.0 / numpy.sqrt(area)
+    best = None
+    for _ in range(steps):
+        scale = 0.5 * (low + high)
+        corners, extent = pack(scale)
+        if extent <= 1.0:
+            low, best = scale, corners
+            if extent > 0.99:
+                break
+        else:
+            high = scale
+    if best is None:
+        # More charts than the lightmap has texels for their margins: pack them anyway
+        low = high / 2.0 ** steps
+        best, _ = pack(low)
+    return best, low
+
+
+class LightmapPacker:
+    """Adds the lightmap UV channel `uv_name` to the meshes of one file; `apply` packs them together."""
+
+    def __init__(self, uv_name, resolution, padding):
+        self.uv_name = uv_name
+        self.resolution = resolution
+        self.padding = padding
+
+    def apply(self, parts):
+        """`parts`: [(MeshArrays, mesh-to-world uniform scale)]. Adds the UV map to every MeshArrays
+        and returns (chart count, share of the square covered by charts)."""
+        global _executor
+        keys, charts, missing = [], [], []
+        for i, (arrays, _) in enumerate(parts):
+            key, entry, hit = cached_charts(arrays)
+            keys.append(key)
+            charts.append(entry)
+            if not hit:
+                missing.append(i)
+        if missing:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="UEFbxLightmap")
+            for i, entry in zip(missing, _executor.map(segment_charts, [parts[i][0] for i in missing])):
+                charts[i] = entry
+                _remember(_charts, keys[i], entry)
+
+        digest = hashlib.blake2b(digest_size=16)
+        for key, (_, scale) in zip(keys, parts):
+            digest.update(f"{key}:{scale:.6g};".encode('utf-8'))
+        digest.update(f"{self.resolution}:{self.padding}".encode('utf-8'))
+        layout_key = digest.hexdigest()
+        if layout_key in _layouts:
+            _layouts.move_to_end(layout_key)
+            layouts, coverage = _layouts[layout_key]
+        else:
+            layouts, coverage = self._pack(charts, [scale for _, scale in parts])
+            _remember(_layouts, layout_key, (layouts, coverage))
+
+        for (arrays, _), uvs in zip(parts, layouts):
+            arrays.attributes[self.uv_name] = ('CORNER', 'FLOAT2', uvs)
+        return sum(len(sizes) for _, _, sizes in charts), coverage
+
+    def _pack(self, charts, scales):
+        """Per mesh corner UVs in the shared square, and the share of the square covered by charts"""
+        sizes = numpy.concatenate([c[2] * s for c, s in zip(charts, scales)])
+        corners, scale = pack_charts(sizes, self.padding / self.resolution)
+        layouts = []
+        first = 0
+        for (corner_chart, uvs, chart_sizes), mesh_scale in zip(charts, scales):
+            placed = corners[first:first + len(chart_sizes)]
+            first += len(chart_sizes)
+            layouts.append(((uvs * mesh_scale + placed[corner_chart]) * scale).astype(numpy.float32))
+        coverage = float(numpy.sum(sizes[:, 0] * sizes[:, 1])) * scale * scale
+        return layouts, coverage
+
+# ------------------------------
+# Registration
+# ------------------------------
+
+def register():
+    pass
+
+
+def unregister():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    _charts.clear()
+    _layouts.clear()
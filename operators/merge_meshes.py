@@ -0,0 +1,128 @@
+import numpy
+
+from .mesh_arrays import MeshArrays, corner_indices, face_starts_from_sizes
+
+# ------------------------------
+# Mesh merging
+# ------------------------------
+#
+# Concatenates the snapshot arrays of an asset's meshes into one MeshArrays with
+# the object transforms baked relative to the asset root, so UE imports a single
+# static mesh per root. Unlike Ctrl+J nothing in the scene is joined: the merged
+# mesh only lives in the export snapshot.
+
+def flipped_corners(arrays):
+    """Corner order reversing the winding of every face (first corner kept)"""
+    order = corner_indices(arrays.face_starts, arrays.face_sizes)
+    offsets = order - numpy.repeat(arrays.face_starts, arrays.face_sizes)
+    sizes = numpy.repeat(arrays.face_sizes, arrays.face_sizes)
+    return numpy.repeat(arrays.face_starts, arrays.face_sizes) + (sizes - offsets) % sizes
+
+
+def transformed(arrays, matrix):
+    """(positions, normals, corner order) of `arrays` under a 4x4 `matrix`"""
+    linear = matrix[:3, :3]
+    positions = arrays.positions.astype(numpy.float64) @ linear.T + matrix[:3, 3]
+    normals = arrays.normals.astype(numpy.float64) @ numpy.linalg.inv(linear)
+    length = numpy.linalg.norm(normals, axis=1)
+    length[length == 0.0] = 1.0
+    normals /= length[:, None]
+    corners = None
+    if numpy.linalg.det(linear) < 0.0:
+        # Mirrored: keep faces pointing outwards
+        corners = flipped_corners(arrays)
+    return positions.astype(numpy.float32), normals.astype(numpy.float32), corners
+
+
+def merge_materials(parts):
+    """Consolidated material list and, per part, the old slot -> new slot map"""
+    materials = []
+    remaps = []
+    for _, _, part_materials, _ in parts:
+        remap = []
+        for mat in part_materials or [None]:
+            if mat not in materials:
+                materials.append(mat)
+            remap.append(materials.index(mat))
+        remaps.append(numpy.array(remap, dtype=numpy.int32))
+    return materials, remaps
+
+
+def canonical_uv_names(parts):
+    """Per part, UV map name -> merged name, matching UV maps by their index (UV0, UV1...)"""
+    names = []
+    renames = []
+    for arrays, _, _, uv_order in parts:
+        uv_maps = [name for name in uv_order if name in arrays.attributes]
+        for k, name in enumerate(uv_maps):
+            if k == len(names):
+                names.append(name)
+        renames.append({name: names[k] for k, name in enumerate(uv_maps)})
+    return renames
+
+
+def merge_arrays(parts, name):
+    """Merge `parts`, a list of (MeshArrays, 4x4 matrix, materials, UV map order)"""
+    merged = MeshArrays()
+    merged.name = name
+    merged.materials, material_remaps = merge_materials(parts)
+    uv_renames = canonical_uv_names(parts)
+    merged.auto_smooth = parts[0][0].auto_smooth
+    merged.custom_normals = any(arrays.custom_normals for arrays, _, _, _ in parts)
+
+    positions, corner_verts, sizes, edges, normals = [], [], [], [], []
+    # name -> (domain, data_type, [values per part or None])
+    attributes = {}
+    vertex_offset = 0
+    for i, (arrays, matrix, _, _) in enumerate(parts):
+        part_positions, part_normals, corners = transformed(arrays, matrix)
+        if corners is None:
+            corners = numpy.arange(len(arrays.corner_verts))
+        positions.append(part_positions)
+        corner_verts.append(arrays.corner_verts[corners] + vertex_offset)
+        sizes.append(arrays.face_sizes)
+        edges.append(arrays.edges + vertex_offset)
+        normals.append(part_normals[corners])
+        vertex_offset += arrays.vertex_count
+
+        material_index = arrays.attributes.get("material_index")
+        if material_index is None:
+            indices = numpy.zeros((arrays.face_count, 1), dtype=numpy.int32)
+        else:
+            indices = material_index[2]
+        indices = material_remaps[i][numpy.clip(indices, 0, len(material_remaps[i]) - 1)]
+
+        for attr_name, (domain, data_type, values) in arrays.attributes.items():
+            if attr_name == "material_index":
+                values = indices
+            attr_name = uv_renames[i].get(attr_name, attr_name)
+            if domain == 'CORNER':
+                values = values[corners]
+            entry = attributes.setdefault(attr_name, (domain, data_type, [None] * len(parts)))
+            if entry[0] == domain and entry[1] == data_type:
+                entry[2][i] = values
+        if material_index is None:
+            attributes.setdefault("material_index", ('FACE', 'INT', [None] * len(parts)))[2][i] = indices
+
+    merged.positions = numpy.concatenate(positions)
+    merged.corner_verts = numpy.concatenate(corner_verts).astype(numpy.int32)
+    merged.face_sizes = numpy.concatenate(sizes).astype(numpy.int32)
+    merged.face_starts = face_starts_from_sizes(merged.face_sizes)
+    merged.edges = numpy.concatenate(edges).astype(numpy.int32)
+    merged.normals = numpy.concatenate(normals)
+
+    # Parts missing an attribute contribute zeros
+    counts = {
+        'POINT': [a.vertex_count for a, _, _, _ in parts],
+        'EDGE': [len(a.edges) for a, _, _, _ in parts],
+        'FACE': [a.face_count for a, _, _, _ in parts],
+        'CORNER': [len(a.corner_verts) for a, _, _, _ in parts],
+    }
+    for attr_name, (domain, data_type, values) in attributes.items():
+        template = next(v for v in values if v is not None)
+        filled = [
+            v if v is not None else numpy.zeros((count, template.shape[1]), dtype=template.dtype)
+            for v, count in zip(values, counts[domain])
+        ]
+        merged.attributes[attr_name] = (domain, data_type, numpy.concatenate(filled))
+    return merged
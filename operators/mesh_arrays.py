@@ -0,0 +1,261 @@
+import bpy
+import hashlib
+import numpy
+
+# ------------------------------
+# Attribute buffers
+# ------------------------------
+
+# data_type: (foreach property, components, numpy dtype)
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ('value', 1, numpy.float32),
+    'INT': ('value', 1, numpy.int32),
+    'INT8': ('value', 1, numpy.int32),
+    'BOOLEAN': ('value', 1, numpy.bool_),
+    'FLOAT2': ('vector', 2, numpy.float32),
+    'INT32_2D': ('value', 2, numpy.int32),
+    'FLOAT_VECTOR': ('vector', 3, numpy.float32),
+    'FLOAT_COLOR': ('color', 4, numpy.float32),
+    'BYTE_COLOR': ('color', 4, numpy.float32),
+    'QUATERNION': ('value', 4, numpy.float32),
+    'FLOAT4X4': ('value', 16, numpy.float32),
+}
+
+
+def read_attribute(attr):
+    """(N, components) array of a generic attribute, None for unsupported types"""
+    layout = ATTRIBUTE_LAYOUTS.get(attr.data_type)
+    if layout is None:
+        return None
+    prop, components, dtype = layout
+    buf = numpy.empty(len(attr.data) * components, dtype=dtype)
+    attr.data.foreach_get(prop, buf)
+    return buf.reshape(-1, components)
+
+
+def write_attribute(attr, values):
+    prop, _, dtype = ATTRIBUTE_LAYOUTS[attr.data_type]
+    attr.data.foreach_set(prop, numpy.ascontiguousarray(values, dtype=dtype).ravel())
+
+
+def is_exported_attribute(name):
+    """Internal ('.'-prefixed) layers and positions are rebuilt by Blender itself"""
+    return name != "position" and not name.startswith(".")
+
+# ------------------------------
+# Mesh <-> arrays
+# ------------------------------
+
+class MeshArrays:
+    """Plain NumPy copy of a mesh: topology, generic attributes, corner normals and materials.
+
+    Export stages work on this instead of BMesh so every pass stays vectorized and the
+    result can be written back in one go with `to_mesh`.
+    """
+
+    def __init__(self):
+        self.name = ""
+        self.positions = numpy.empty((0, 3), dtype=numpy.float32)
+        self.corner_verts = numpy.empty(0, dtype=numpy.int32)
+        self.face_starts = numpy.empty(0, dtype=numpy.int32)
+        self.face_sizes = numpy.empty(0, dtype=numpy.int32)
+        self.edges = numpy.empty((0, 2), dtype=numpy.int32)
+        # name -> (domain, data_type, (N, components) array)
+        self.attributes = {}
+        # (corners, 3) corner normals; written back as custom normals only when
+        # `custom_normals` is set (the source had them or a stage changed them)
+        self.normals = numpy.empty((0, 3), dtype=numpy.float32)
+        self.custom_normals = False
+        self.materials = []
+        # (use_auto_smooth, auto_smooth_angle) on Blender < 4.1, None otherwise
+        self.auto_smooth = None
+
+    @property
+    def vertex_count(self):
+        return len(self.positions)
+
+    @property
+    def face_count(self):
+        return len(self.face_starts)
+
+    @property
+    def is_triangulated(self):
+        return bool(numpy.all(self.face_sizes == 3))
+
+    def triangles(self):
+        """(F, 3) vertex indices, only valid on triangulated arrays"""
+        return self.corner_verts.reshape(-1, 3)
+
+    def face_corners(self):
+        """Face index of every corner"""
+        return numpy.repeat(numpy.arange(self.face_count, dtype=numpy.int32), self.face_sizes)
+
+    @classmethod
+    def from_mesh(cls, mesh):
+        arrays = cls()
+        arrays.name = mesh.name
+
+        arrays.positions = numpy.empty(len(mesh.vertices) * 3, dtype=numpy.float32)
+        mesh.vertices.foreach_get("co", arrays.positions)
+        arrays.positions.shape = (-1, 3)
+
+        arrays.corner_verts = numpy.empty(len(mesh.loops), dtype=numpy.int32)
+        mesh.loops.foreach_get("vertex_index", arrays.corner_verts)
+
+        arrays.face_starts = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+        mesh.polygons.foreach_get("loop_start", arrays.face_starts)
+        arrays.face_sizes = numpy.empty(len(mesh.polygons), dtype=numpy.int32)
+        mesh.polygons.foreach_get("loop_total", arrays.face_sizes)
+
+        arrays.edges = numpy.empty(len(mesh.edges) * 2, dtype=numpy.int32)
+        mesh.edges.foreach_get("vertices", arrays.edges)
+        arrays.edges.shape = (-1, 2)
+
+        for attr in mesh.attributes:
+            if not is_exported_attribute(attr.name):
+                continue
+            values = read_attribute(attr)
+            if values is not None:
+                arrays.attributes[attr.name] = (attr.domain, attr.data_type, values)
+
+        arrays.normals = read_corner_normals(mesh)
+        arrays.custom_normals = mesh.has_custom_normals
+        if hasattr(mesh, "use_auto_smooth"):
+            arrays.auto_smooth = (mesh.use_auto_smooth, mesh.auto_smooth_angle)
+        arrays.materials = list(mesh.materials)
+        return arrays
+
+    def to_mesh(self, name=None):
+        mesh = bpy.data.meshes.new(name or self.name)
+        mesh.vertices.add(self.vertex_count)
+        mesh.loops.add(len(self.corner_verts))
+        mesh.polygons.add(self.face_count)
+
+        mesh.vertices.foreach_set("co", self.positions.ravel())
+        mesh.loops.foreach_set("vertex_index", self.corner_verts)
+        # Face sizes follow from the offsets (loop_total is read-only since 4.0)
+        mesh.polygons.foreach_set("loop_start", self.face_starts)
+        mesh.update(calc_edges=True)
+
+        for mat in self.materials:
+            mesh.materials.append(mat)
+
+        edge_values = None
+        for attr_name, (domain, data_type, values) in self.attributes.items():
+            if domain == 'EDGE':
+                if edge_values is None:
+                    edge_values = edge_remap(self.edges, mesh)
+                values = values[edge_values]
+            attr = mesh.attributes.get(attr_name)
+            if attr is None or attr.domain != domain or attr.data_type != data_type:
+                if attr is not None:
+                    mesh.attributes.remove(attr)
+                attr = mesh.attributes.new(attr_name, data_type, domain)
+            write_attribute(attr, values)
+
+        if self.auto_smooth is not None:
+            mesh.use_auto_smooth, mesh.auto_smooth_angle = self.auto_smooth
+        if self.custom_normals:
+            if hasattr(mesh, "use_auto_smooth"):
+                mesh.use_auto_smooth = True
+            mesh.normals_split_custom_set(self.normals)
+        mesh.update()
+        return mesh
+
+    def reordered(self, face_order, vertex_order):
+        """Copy with faces emitted in `face_order` and vertices renumbered so that
+        new vertex i is old vertex `vertex_order[i]`"""
+        new = MeshArrays()
+        new.name = self.name
+        new.materials = list(self.materials)
+        new.auto_smooth = self.auto_smooth
+        new.custom_normals = self.custom_normals
+
+        vertex_map = numpy.empty(self.vertex_count, dtype=numpy.int32)
+        vertex_map[vertex_order] = numpy.arange(len(vertex_order), dtype=numpy.int32)
+
+        sizes = self.face_sizes[face_order]
+        corner_order = corner_indices(self.face_starts[face_order], sizes)
+
+        new.positions = self.positions[vertex_order]
+        new.corner_verts = vertex_map[self.corner_verts[corner_order]]
+        new.face_sizes = sizes
+        new.face_starts = face_starts_from_sizes(sizes)
+        new.edges = vertex_map[self.edges]
+        new.normals = self.normals[corner_order]
+
+        for attr_name, (domain, data_type, values) in self.attributes.items():
+            if domain == 'POINT':
+                values = values[vertex_order]
+            elif domain == 'CORNER':
+                values = values[corner_order]
+            elif domain == 'FACE':
+                values = values[face_order]
+            new.attributes[attr_name] = (domain, data_type, values)
+        return new
+
+
+def read_corner_normals(mesh):
+    normals = numpy.empty(len(mesh.loops) * 3, dtype=numpy.float32)
+    if hasattr(mesh, "corner_normals"):
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def face_starts_from_sizes(sizes):
+    starts = numpy.zeros(len(sizes), dtype=numpy.int32)
+    numpy.cumsum(sizes[:-1], out=starts[1:])
+    return starts
+
+
+def corner_indices(starts, sizes):
+    """Flat corner indices of faces given by (starts, sizes), in that order"""
+    total = int(sizes.sum())
+    offsets = numpy.arange(total, dtype=numpy.int32) - numpy.repeat(face_starts_from_sizes(sizes), sizes)
+    return numpy.repeat(starts, sizes) + offsets
+
+
+def edge_keys(edges, vertex_count):
+    lo = numpy.minimum(edges[:, 0], edges[:, 1]).astype(numpy.int64)
+    hi = numpy.maximum(edges[:, 0], edges[:, 1]).astype(numpy.int64)
+    return lo * vertex_count + hi
+
+
+def edge_remap(old_edges, mesh):
+    """For every edge of `mesh`, the index of the matching edge in `old_edges`"""
+    new_edges = numpy.empty(len(mesh.edges) * 2, dtype=numpy.int32)
+    mesh.edges.foreach_get("vertices", new_edges)
+    vertex_count = len(mesh.vertices)
+    old_keys = edge_keys(old_edges, vertex_count)
+    new_keys = edge_keys(new_edges.reshape(-1, 2), vertex_count)
+    order = numpy.argsort(old_keys)
+    found = numpy.searchsorted(old_keys, new_keys, sorter=order)
+    found = numpy.clip(found, 0, max(len(order) - 1, 0))
+    return order[found]
+
+
+def first_use_vertex_order(corner_verts, vertex_count):
+    """Vertex order following first reference in `corner_verts`; unreferenced vertices go last"""
+    used, first = numpy.unique(corner_verts, return_index=True)
+    order = used[numpy.argsort(first)]
+    if len(order) < vertex_count:
+        unused = numpy.setdiff1d(numpy.arange(vertex_count, dtype=order.dtype), used, assume_unique=True)
+        order = numpy.concatenate((order, unused))
+    return order.astype(numpy.int32)
+
+
+def fingerprint(arrays, attributes=True):
+    """Content hash of the geometry (and optionally normals/attributes) of a MeshArrays"""
+    digest = hashlib.blake2b(digest_size=16)
+    for values in (arrays.positions, arrays.corner_verts, arrays.face_sizes):
+        digest.update(numpy.ascontiguousarray(values).data)
+    if attributes:
+        digest.update(numpy.ascontiguousarray(arrays.normals).data)
+        for name in sorted(arrays.attributes):
+            domain, data_type, values = arrays.attributes[name]
+            digest.update(f"{name}:{domain}:{data_type}".encode('utf-8'))
+            digest.update(numpy.ascontiguousarray(values).data)
+    return digest.hexdigest()
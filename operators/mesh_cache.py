@@ -0,0 +1,263 @@
+import bpy
+import hashlib
+import json
+import os
+import tempfile
+import numpy
+
+from .mesh_arrays import MeshArrays, fingerprint
+
+# ------------------------------
+# Evaluated mesh cache
+# ------------------------------
+#
+# Evaluated, triangulated MeshArrays stored as compressed .npz files, keyed by
+# everything the evaluation depends on: the source mesh content, the modifier
+# stack settings, the scene frame when the stack is animated, and the transforms
+# and modifier stacks of the objects the modifiers and their node trees reference
+# (transforms relative to the exported object, so moving a whole asset keeps its
+# entries). Stacks that read vertex group weights, their own or a referenced
+# object's, have no key and are not cached: the weights are only readable per
+# vertex, which costs about as much as the evaluation.
+# On a hit the snapshot rebuilds the mesh from the arrays and the modifier stack
+# is never evaluated. Files are evicted least recently used first once the cache
+# grows past its size limit.
+
+CACHE_VERSION = 1
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "UEFbxExporter", "mesh_cache")
+# Node properties that only place a node in the editor
+UI_PROPERTIES = {"rna_type", "location", "width", "height", "select", "dimensions"}
+
+
+def _reads_vertex_groups(obj):
+    if not obj.vertex_groups:
+        return False
+    for mod in obj.modifiers:
+        # Geometry Nodes may read any group by name, through inputs or Named Attribute nodes
+        if mod.type == 'NODES':
+            return True
+        if any(
+            p.type == 'STRING' and "vertex_group" in p.identifier and getattr(mod, p.identifier)
+            for p in mod.bl_rna.properties
+        ):
+            return True
+    return False
+
+
+class Unkeyable(Exception):
+    """The evaluation depends on data the key cannot cover"""
+
+
+def cacheable(obj):
+    """Only modifier stacks are worth caching: without them the evaluated mesh is the mesh itself"""
+    return any(mod.show_viewport for mod in obj.modifiers)
+
+
+def _matrix_values(matrix):
+    return [round(v, 6) for row in matrix for v in row]
+
+
+def _animated(id_data):
+    animation = id_data.animation_data
+    return animation is not None and (animation.action is not None or len(animation.drivers) > 0)
+
+
+def _node_tree_signature(tree, owner, seen):
+    if tree.name in seen:
+        return tree.name
+    seen.add(tree.name)
+    nodes = []
+    time_dependent = _animated(tree)
+    for node in tree.nodes:
+        inputs = [_value(s.default_value, owner, seen) for s in node.inputs if hasattr(s, "default_value")]
+        props = [_value(getattr(node, p.identifier), owner, seen) for p in node.bl_rna.properties
+                 if p.identifier not in UI_PROPERTIES and p.type != 'COLLECTION']
+        nodes.append((node.bl_idname, node.name, inputs, props))
+        time_dependent = time_dependent or node.bl_idname == 'GeometryNodeInputSceneTime'
+    links = [(l.from_node.name, l.from_socket.identifier, l.to_node.name, l.to_socket.identifier) for l in tree.links]
+    signature = [tree.name, nodes, links]
+    if time_dependent:
+        signature.append(_frame())
+    return signature
+
+
+def _struct_signature(struct, owner, seen):
+    """Plain property values of a non-ID struct (e.g. a node's frame parent); its repr holds a
+    memory address, which would change the key every session"""
+    props = [
+        (p.identifier, _value(getattr(struct, p.identifier), owner, seen))
+        for p in struct.bl_rna.properties
+        if p.identifier not in UI_PROPERTIES and p.type not in {'POINTER', 'COLLECTION'}
+    ]
+    return [struct.bl_rna.identifier, props]
+
+
+def _value(value, owner, seen):
+    """JSON-friendly signature of a modifier/node property value"""
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    if isinstance(value, bpy.types.Object):
+        signature = [value.name]
+        if owner is not None:
+            signature.append(_matrix_values(owner.matrix_world.inverted() @ value.matrix_world))
+        if value.type == 'MESH' and value.name not in seen:
+            seen.add(value.name)
+            signature.append(fingerprint(MeshArrays.from_mesh(value.data), attributes=False))
+            # Its evaluated mesh is what the modifier reads
+            signature.append(_stack_signature(value, seen))
+        return signature
+    if isinstance(value, bpy.types.Collection):
+        return [_value(o, owner, seen) for o in value.all_objects]
+    if isinstance(value, bpy.types.NodeTree):
+        return _node_tree_signature(value, owner, seen)
+    if isinstance(value, bpy.types.ID):
+        return value.name_full
+    if isinstance(value, bpy.types.bpy_struct):
+        return _struct_signature(value, owner, seen)
+    if isinstance(value, (set, frozenset)):
+        # Enum flags: set order changes with string hashing between sessions
+        return sorted(_value(v, owner, seen) for v in value)
+    try:
+        return [_value(v, owner, seen) for v in value]
+    except TypeError:
+        # Nothing stable to key on
+        return type(value).__name__
+
+
+def _frame():
+    scene = bpy.context.scene
+    return scene.frame_current + scene.frame_subframe
+
+
+def _stack_signature(obj, seen):
+    if _reads_vertex_groups(obj):
+        raise Unkeyable(f"{obj.name} reads vertex group weights")
+    signature = []
+    for mod in obj.modifiers:
+        props = {}
+        for prop in mod.bl_rna.properties:
+            if prop.identifier in {"rna_type", "name", "show_expanded", "is_active"} or prop.type == 'COLLECTION':
+                continue
+            props[prop.identifier] = _value(getattr(mod, prop.identifier), obj, seen)
+        # Geometry Nodes inputs live in ID properties
+        for key in mod.keys():
+            props[key] = _value(mod[key], obj, seen)
+        signature.append((mod.type, props))
+    # Keyframed or driven modifier settings change with the frame
+    if _animated(obj):
+        signature.append(_frame())
+    return signature
+
+
+def modifier_signature(obj):
+    return _stack_signature(obj, {obj.name})
+
+
+def cache_key(obj):
+    """Key of the evaluated mesh of `obj`, None when it cannot be keyed (see Unkeyable)"""
+    try:
+        signature = modifier_signature(obj)
+    except Unkeyable:
+        return None
+    source = MeshArrays.from_mesh(obj.data)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{CACHE_VERSION}:{bpy.app.version}".encode('utf-8'))
+    digest.update(fingerprint(source).encode('utf-8'))
+    digest.update(json.dumps([m.name if m else None for m in obj.data.materials]).encode('utf-8'))
+    digest.update(json.dumps(signature, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class MeshCache:
+    """Evaluated MeshArrays on disk, shared by all roots of one export"""
+
+    def __init__(self, directory="", max_bytes=0):
+        self.directory = bpy.path.abspath(directory) if directory else DEFAULT_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def load(self, key):
+        path = self._path(key)
+        try:
+            with numpy.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = MeshArrays()
+                arrays.positions = data["positions"]
+                arrays.corner_verts = data["corner_verts"]
+                arrays.face_starts = data["face_starts"]
+                arrays.face_sizes = data["face_sizes"]
+                arrays.edges = data["edges"]
+                arrays.normals = data["normals"]
+                for i, (name, domain, data_type) in enumerate(meta["attributes"]):
+                    arrays.attributes[name] = (domain, data_type, data[f"attribute_{i}"])
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        arrays.custom_normals = meta["custom_normals"]
+        arrays.auto_smooth = tuple(meta["auto_smooth"]) if meta["auto_smooth"] else None
+        arrays.materials = [bpy.data.materials.get(name) if name else None for name in meta["materials"]]
+        # Touch for LRU eviction
+        os.utime(path)
+        self.hits += 1
+        return arrays
+
+    def store(self, key, arrays):
+        meta = {
+            "attributes": [(name, domain, data_type) for name, (domain, data_type, _) in arrays.attributes.items()],
+            "custom_normals": arrays.custom_normals,
+            "auto_smooth": arrays.auto_smooth,
+            "materials": [m.name if m else None for m in arrays.materials],
+        }
+        buffers = {
+            f"attribute_{i}": values for i, (_, _, values) in enumerate(arrays.attributes.values())
+        }
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                numpy.savez_compressed(
+                    f,
+                    meta=numpy.array(json.dumps(meta)),
+                    positions=arrays.positions,
+                    corner_verts=arrays.corner_verts,
+                    face_starts=arrays.face_starts,
+                    face_sizes=arrays.face_sizes,
+                    edges=arrays.edges,
+                    normals=arrays.normals,
+                    **buffers,
+                )
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[UEFbxExporter] Mesh cache: could not store {key}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in `max_bytes` (0 = unbounded)"""
+        if not self.max_bytes:
+            return 0
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def summary(self):
+        return f"Mesh cache: {self.hits} hits, {self.misses} misses"
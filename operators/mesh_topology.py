@@ -0,0 +1,92 @@
+import numpy
+
+from .mesh_arrays import edge_keys
+
+# ------------------------------
+# Mesh topology
+# ------------------------------
+#
+# Face adjacency over manifold edges (with whether the shared edge is smooth),
+# face normals and connected components on MeshArrays, for the mesh passes
+# that segment faces, like the lightmap chart segmentation.
+
+
+def corner_edge_keys(arrays):
+    """Edge key (see edge_keys) of the edge leaving every corner"""
+    nxt = numpy.arange(len(arrays.corner_verts), dtype=numpy.int64) + 1
+    last = arrays.face_starts + arrays.face_sizes - 1
+    nxt[last] = arrays.face_starts
+    pairs = numpy.stack((arrays.corner_verts, arrays.corner_verts[nxt]), axis=1)
+    return edge_keys(pairs, arrays.vertex_count)
+
+
+def face_normals(arrays):
+    corners = arrays.positions.astype(numpy.float64)[arrays.corner_verts]
+    nxt = numpy.roll(corners, -1, axis=0)
+    # Newell's method, summed per face
+    cross = numpy.cross(corners, nxt)
+    first = arrays.face_starts
+    last = first + arrays.face_sizes - 1
+    cross[last] = numpy.cross(corners[last], corners[first])
+    normals = numpy.add.reduceat(cross, first, axis=0) if len(first) else cross[:0]
+    length = numpy.linalg.norm(normals, axis=1)
+    length[length == 0.0] = 1.0
+    return normals / length[:, None]
+
+
+def _sharp_edge_keys(arrays):
+    entry = arrays.attributes.get("sharp_edge")
+    if entry is None or entry[0] != 'EDGE':
+        return numpy.empty(0, dtype=numpy.int64)
+    sharp = entry[2].ravel().astype(bool)
+    return edge_keys(arrays.edges[sharp], arrays.vertex_count)
+
+
+def face_pairs(arrays):
+    """(P, 2) faces sharing a manifold edge, and whether that edge is smooth"""
+    keys = corner_edge_keys(arrays)
+    faces = arrays.face_corners()
+    order = numpy.argsort(keys, kind='stable')
+    keys = keys[order]
+    faces = faces[order]
+    _, start, count = numpy.unique(keys, return_index=True, return_counts=True)
+    manifold = start[count == 2]
+    pairs = numpy.stack((faces[manifold], faces[manifold + 1]), axis=1)
+    pair_keys = keys[manifold]
+
+    smooth = ~numpy.isin(pair_keys, _sharp_edge_keys(arrays))
+    entry = arrays.attributes.get("sharp_face")
+    if entry is not None and entry[0] == 'FACE':
+        sharp_face = entry[2].ravel().astype(bool)
+        smooth &= ~(sharp_face[pairs[:, 0]] | sharp_face[pairs[:, 1]])
+    if arrays.auto_smooth and arrays.auto_smooth[0]:
+        # Blender < 4.1: edges above the auto smooth angle are sharp too
+        normals = face_normals(arrays)
+        cos = numpy.einsum('ij,ij->i', normals[pairs[:, 0]], normals[pairs[:, 1]])
+        smooth &= cos >= numpy.cos(arrays.auto_smooth[1])
+    return pairs, smooth
+
+
+def connected_components(count, pairs):
+    """Component label (0..n-1) of `count` nodes linked by `pairs`, by min-label propagation
+    with pointer jumping"""
+    labels = numpy.arange(count, dtype=numpy.int64)
+    if len(pairs) == 0:
+        return labels, count
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = numpy.minimum(labels[a], labels[b])
+        new = labels.copy()
+        numpy.minimum.at(new, a, low)
+        numpy.minimum.at(new, b, low)
+        # Pointer jumping: follow labels until they point to themselves
+        while True:
+            jumped = new[new]
+            if numpy.array_equal(jumped, new):
+                break
+            new = jumped
+        if numpy.array_equal(new, labels):
+            break
+        labels = new
+    _, labels = numpy.unique(labels, return_inverse=True)
+    return labels.ravel(), int(labels.max()) + 1
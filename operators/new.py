@@ -1,5 +1,6 @@
 import bpy
 from bpy.props import BoolProperty, EnumProperty
+from . import asset_index
 
 # ------------------------------
 # Blender Operator to Create New Asset
@@ -79,6 +80,7 @@ class OBJECT_OT_NewAsset(bpy.types.Operator):
         for obj in selected_objects:
             obj.parent = empty
             obj.matrix_parent_inverse = empty.matrix_world.inverted()
+            asset_index.index.assign(obj, empty)
 
         self.report({'INFO'}, "New asset created successfully")
         return {'FINISHED'}
@@ -0,0 +1,107 @@
+import numpy
+
+# ------------------------------
+# Render vertex estimation
+# ------------------------------
+#
+# UE builds one render vertex per unique (position, normal, UV sets, color) wedge,
+# so UV seams, hard edges and color splits multiply Blender's vertex count.
+
+def split_attributes(arrays):
+    """Names of the corner attributes that split render vertices: UV maps and corner colors"""
+    return [
+        name for name, (domain, data_type, _) in arrays.attributes.items()
+        if domain == 'CORNER' and data_type in {'FLOAT2', 'FLOAT_COLOR', 'BYTE_COLOR'}
+    ]
+
+
+def _exact_bits(values):
+    """Float components as integers, so unique() compares them bit for bit (-0.0 == 0.0)"""
+    values = numpy.ascontiguousarray(values, dtype=numpy.float32) + numpy.float32(0.0)
+    return values.view(numpy.int32)
+
+
+def _wedge_keys(arrays, tolerance):
+    """(corners, K) integer matrix identifying the render vertex of every corner"""
+    columns = [arrays.corner_verts[:, None].astype(numpy.int64)]
+    values = [arrays.normals] + [arrays.attributes[name][2] for name in split_attributes(arrays)]
+    for v in values:
+        if tolerance > 0.0:
+            columns.append(numpy.round(v / tolerance).astype(numpy.int64))
+        else:
+            columns.append(_exact_bits(v).astype(numpy.int64))
+    return numpy.hstack(columns)
+
+
+def count_unique_rows(keys):
+    if len(keys) == 0:
+        return 0
+    keys = numpy.ascontiguousarray(keys)
+    rows = keys.view(numpy.dtype((numpy.void, keys.dtype.itemsize * keys.shape[1])))
+    return len(numpy.unique(rows))
+
+
+def render_vertex_count(arrays, tolerance=0.0):
+    """Number of unique wedges, with float attributes compared within `tolerance` (0 = exact)"""
+    return count_unique_rows(_wedge_keys(arrays, tolerance))
+
+
+def _snap_groups(corner_verts, values, tolerance):
+    """Replace every corner value by the mean of the values of the same vertex within `tolerance`"""
+    keys = numpy.hstack((corner_verts[:, None].astype(numpy.int64), numpy.round(values / tolerance).astype(numpy.int64)))
+    rows = numpy.ascontiguousarray(keys).view(numpy.dtype((numpy.void, keys.dtype.itemsize * keys.shape[1])))
+    _, group, counts = numpy.unique(rows.ravel(), return_inverse=True, return_counts=True)
+    group = group.ravel()
+    means = numpy.stack(
+        [numpy.bincount(group, weights=values[:, i], minlength=len(counts)) for i in range(values.shape[1])], axis=1
+    ) / counts[:, None]
+    return means[group]
+
+
+def merge_split_attributes(arrays, tolerance):
+    """Merge near-identical normals, UVs and colors around each vertex in place"""
+    # Left unnormalized: groups of identical normals keep their exact values, and
+    # normals_split_custom_set normalizes anyway
+    normals = _snap_groups(arrays.corner_verts, arrays.normals.astype(numpy.float64), tolerance)
+    normals = normals.astype(numpy.float32)
+    if not numpy.array_equal(normals, arrays.normals):
+        arrays.normals = normals
+        arrays.custom_normals = True
+
+    for name in split_attributes(arrays):
+        domain, data_type, values = arrays.attributes[name]
+        merged = _snap_groups(arrays.corner_verts, values.astype(numpy.float64), tolerance)
+        arrays.attributes[name] = (domain, data_type, merged.astype(values.dtype))
+
+
+def make_export_stage(merge, tolerance):
+    def export_stage(snapshot, obj, arrays):
+        estimate = render_vertex_count(arrays)
+        merged = estimate
+        if merge and tolerance > 0.0:
+            merge_split_attributes(arrays, tolerance)
+            merged = render_vertex_count(arrays)
+
+        totals = snapshot.totals
+        totals["blender_vertices"] = totals.get("blender_vertices", 0) + arrays.vertex_count
+        totals["render_vertices"] = totals.get("render_vertices", 0) + merged
+        totals["render_vertices_saved"] = totals.get("render_vertices_saved", 0) + estimate - merged
+
+        line = f"{obj.name}: {estimate} render vertices ({arrays.vertex_count} in Blender)"
+        if merged != estimate:
+            line += f", {merged} after merging splits (-{estimate - merged})"
+        snapshot.report.append(line)
+        return arrays
+    return export_stage
+
+
+def root_summary(name, totals):
+    """One line for the export summary, None if the stage did not run"""
+    if "render_vertices" not in totals:
+        return None
+    render, blender = totals["render_vertices"], totals["blender_vertices"]
+    ratio = render / blender if blender else 0.0
+    line = f"{name}: ~{render} render vertices ({ratio:.2f}x Blender's {blender})"
+    if totals["render_vertices_saved"]:
+        line += f", saved {totals['render_vertices_saved']} by merging splits"
+    return line
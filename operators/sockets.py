@@ -2,6 +2,7 @@ import bpy
 import math
 from bpy.props import EnumProperty
 from bpy.types import Operator
+from . import asset_index
 
 # ------------------------------
 # Operator: Create Socket Empty at Cursor and Parent
@@ -51,6 +52,7 @@ class OBJECT_OT_CreateSocket(Operator):
         # Step 3: Parent to the dummy
         empty.parent = parent_dummy
         empty.matrix_parent_inverse = parent_dummy.matrix_world.inverted()
+        asset_index.index.assign(empty, asset_index.index.root(parent_dummy))
 
         self.report({'INFO'}, f"Socket created under '{parent_dummy.name}'")
         return {'FINISHED'}
@@ -0,0 +1,52 @@
+import numpy
+
+# ------------------------------
+# Tangent space
+# ------------------------------
+#
+# With `use_tspace` the FBX writer stores MikkTSpace tangents and bitangent signs
+# (computed by Blender's C implementation), so UE can import them instead of
+# recomputing them on every reimport. The writer computes the tangents itself;
+# this check only counts triangles with degenerate UVs before export, where the
+# tangent is undefined and comes out as a shading seam in UE. It reads the
+# evaluated meshes in place, so it adds no export snapshot.
+
+
+def degenerate_uv_triangles(uv):
+    """Triangles of (T, 3, 2) corner UVs with (almost) zero area"""
+    uv = uv.astype(numpy.float64)
+    d1 = uv[:, 1] - uv[:, 0]
+    d2 = uv[:, 2] - uv[:, 0]
+    det = d1[:, 0] * d2[:, 1] - d2[:, 0] * d1[:, 1]
+    return int(numpy.count_nonzero(numpy.abs(det) < 1e-12))
+
+
+def triangle_uvs(mesh, uv_layer):
+    """(T, 3, 2) UVs of the loop triangles of `mesh`"""
+    loops = numpy.empty(len(mesh.loop_triangles) * 3, dtype=numpy.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+    uv = numpy.empty(len(mesh.loops) * 2, dtype=numpy.float32)
+    uv_layer.data.foreach_get("uv", uv)
+    return uv.reshape(-1, 2)[loops].reshape(-1, 3, 2)
+
+
+def check_uvs(objects, depsgraph):
+    """Report lines for the meshes of `objects` whose tangents will be incomplete: no UV map,
+    or triangles with degenerate UVs in the first one (UE's UV0, which tangents are built from)"""
+    report = []
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        mesh = obj.evaluated_get(depsgraph).data
+        if not mesh.polygons:
+            continue
+        if not mesh.uv_layers:
+            report.append(f"{obj.name}: no UV map, the FBX will carry no tangents for it")
+            continue
+        uv_layer = mesh.uv_layers[0]
+        degenerate = degenerate_uv_triangles(triangle_uvs(mesh, uv_layer))
+        if degenerate:
+            report.append(
+                f"{obj.name}: {degenerate} triangles with degenerate UVs in '{uv_layer.name}' (tangents undefined there)"
+            )
+    return report
@@ -0,0 +1,265 @@
+import bpy
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .instancing import SIDECAR_SUFFIX
+
+# ------------------------------
+# Background upload of exports
+# ------------------------------
+#
+# Writing an FBX straight to a network share makes the exporter wait on every
+# small write the FBX writer does. When the export folder is remote, files are
+# written to a local staging folder instead and copied over by a small thread
+# pool: copy to a temporary name next to the target, then os.replace, so UE's
+# auto-reimport never sees a half-written file. Failed copies are retried with
+# backoff and the local file is kept until the upload succeeds. Every export
+# run stages into its own folder, and a newer file for a target replaces one
+# still waiting, so a re-export never loses to (or deletes) an older upload.
+
+STAGING_DIR = os.path.join(tempfile.gettempdir(), "UEFbxExporter", "staging")
+WORKERS = 2
+RETRIES = 4
+RETRY_DELAY = 1.0
+
+NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "sshfs", "fuse.sshfs", "9p", "afs", "davfs", "fuse.rclone", "afpfs", "webdav"}
+# `mount` output on macOS: "<device> on <mount point> (<fs type>, <options>)"
+DARWIN_MOUNT_LINE = re.compile(r"^.+? on (.+) \(([^,)]+)")
+
+
+def _windows_drive_is_remote(path):
+    import ctypes
+    drive = os.path.splitdrive(os.path.abspath(path))[0]
+    if not drive:
+        return False
+    DRIVE_REMOTE = 4
+    return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+
+
+def _mount_table():
+    """[(mount point, filesystem type)] from /proc/mounts (Linux) or `mount` (macOS)"""
+    if sys.platform == "darwin":
+        try:
+            output = subprocess.run(["/sbin/mount"], capture_output=True, text=True, timeout=5.0).stdout
+        except (OSError, subprocess.SubprocessError):
+            return []
+        matches = (DARWIN_MOUNT_LINE.match(line) for line in output.splitlines())
+        return [m.groups() for m in matches if m]
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            return [
+                (fields[1].replace("\\040", " "), fields[2])
+                for fields in (line.split() for line in f) if len(fields) > 2
+            ]
+    except OSError:
+        return []
+
+
+def _mount_filesystem(path):
+    """Filesystem type of the mount holding `path` (Linux, macOS), None if unknown"""
+    path = os.path.realpath(path)
+    best = None
+    for mount_point, fs_type in _mount_table():
+        if path == mount_point or path.startswith(mount_point.rstrip("/") + "/"):
+            if best is None or len(mount_point) > len(best[0]):
+                best = (mount_point, fs_type)
+    return best[1] if best else None
+
+
+def is_network_path(path):
+    if path.startswith(("\\\\", "//")):
+        return True
+    try:
+        if sys.platform == "win32":
+            return _windows_drive_is_remote(path)
+        return _mount_filesystem(path) in NETWORK_FILESYSTEMS
+    except Exception:
+        return False
+
+
+def write_dir(export_dir, prefs):
+    """Folder the exporter writes to: a new staging folder of this run for remote export folders"""
+    mode = getattr(prefs, "stage_exports", 'AUTO')
+    if mode == 'NEVER' or (mode == 'AUTO' and not is_network_path(export_dir)):
+        return export_dir
+    path = os.path.join(STAGING_DIR, uuid.uuid4().hex)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _discard(local_path):
+    """Remove an uploaded/superseded staged file, and its run folder once empty"""
+    try:
+        os.remove(local_path)
+        os.rmdir(os.path.dirname(local_path))
+    except OSError:
+        pass
+
+
+class UploadQueue:
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = {}
+        # target -> newest staged file for it, and the lock serializing its uploads
+        self._latest = {}
+        self._target_locks = {}
+        # (file name, error) of uploads that ran out of retries
+        self.failed = []
+        self.uploaded = 0
+
+    def submit(self, local_path, export_dir):
+        self._enqueue(local_path, os.path.join(export_dir, os.path.basename(local_path)))
+
+    def submit_removal(self, target):
+        """Delete `target` in the export folder, in order with the uploads to it"""
+        self._enqueue(None, target)
+
+    def _enqueue(self, local_path, target):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="UEFbxUpload")
+        with self._lock:
+            # A newer export of the same file replaces one still waiting
+            self._latest[target] = local_path
+            self.pending[target] = 0
+            target_lock = self._target_locks.setdefault(target, threading.Lock())
+        self._executor.submit(self._upload, local_path, target, target_lock)
+        _start_redraw_timer()
+
+    def _superseded(self, local_path, target):
+        with self._lock:
+            return self._latest.get(target) != local_path
+
+    def _upload(self, local_path, target, target_lock):
+        """Copy `local_path` to `target`, or remove `target` when `local_path` is None"""
+        error = None
+        superseded = False
+        # One upload per target at a time, so an older copy never lands after a newer one
+        with target_lock:
+            for attempt in range(RETRIES + 1):
+                if self._superseded(local_path, target):
+                    superseded = True
+                    break
+                with self._lock:
+                    self.pending[target] = attempt
+                tmp = f"{target}.{uuid.uuid4().hex[:8]}.part"
+                try:
+                    if local_path is None:
+                        if os.path.exists(target):
+                            os.remove(target)
+                        break
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    shutil.copyfile(local_path, tmp)
+                    os.replace(tmp, target)
+                    error = None
+                    break
+                except OSError as e:
+                    error = e
+                    try:
+                        if os.path.exists(tmp):
+                            os.remove(tmp)
+                    except OSError:
+                        pass
+                    time.sleep(RETRY_DELAY * (2 ** attempt))
+        if local_path is not None and (error is None or superseded):
+            _discard(local_path)
+        with self._lock:
+            if self._latest.get(target) == local_path:
+                del self._latest[target]
+                del self._target_locks[target]
+                self.pending.pop(target, None)
+            if superseded:
+                return
+            if local_path is None:
+                if error is not None:
+                    self.failed.append((os.path.basename(target), f"could not remove: {error}"))
+                return
+            if error is None:
+                self.uploaded += 1
+            else:
+                self.failed.append((os.path.basename(target), str(error)))
+                print(f"[UEFbxExporter] Upload of {local_path} to {target} failed: {error}")
+
+    def status(self):
+        """(pending file names, failed uploads)"""
+        with self._lock:
+            return [os.path.basename(t) for t in self.pending], list(self.failed)
+
+    def clear_failed(self):
+        with self._lock:
+            self.failed.clear()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+queue = UploadQueue()
+
+
+def upload_outputs(filepath, export_dir, detected_instances=False):
+    """Queue staged `filepath` and the side-car files the exporter wrote next to it. When this
+    export ran instance detection (`detected_instances`) and found none, the side-car is removed
+    from the export folder, so UE never reads a stale one"""
+    if os.path.isfile(filepath):
+        queue.submit(filepath, export_dir)
+    sidecar = os.path.splitext(filepath)[0] + SIDECAR_SUFFIX
+    if os.path.isfile(sidecar):
+        queue.submit(sidecar, export_dir)
+    elif detected_instances:
+        queue.submit_removal(os.path.join(export_dir, os.path.basename(sidecar)))
+
+# ------------------------------
+# Topbar refresh
+# ------------------------------
+
+def _tag_topbar_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'TOPBAR':
+                area.tag_redraw()
+
+
+def _redraw_while_uploading():
+    _tag_topbar_redraw()
+    pending, _ = queue.status()
+    return 0.5 if pending else None
+
+
+def _start_redraw_timer():
+    if not bpy.app.timers.is_registered(_redraw_while_uploading):
+        bpy.app.timers.register(_redraw_while_uploading, first_interval=0.5)
+
+
+class WM_OT_clear_failed_uploads(bpy.types.Operator):
+    bl_idname = "wm.ue_clear_failed_uploads"
+    bl_label = "Clear Failed Uploads"
+    bl_description = "Forget failed uploads (their files stay in the staging folder)"
+
+    def execute(self, context):
+        _, failed = queue.status()
+        for name, error in failed:
+            self.report({'WARNING'}, f"{name}: {error} (kept in {STAGING_DIR})")
+        queue.clear_failed()
+        _tag_topbar_redraw()
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(WM_OT_clear_failed_uploads)
+
+
+def unregister():
+    if bpy.app.timers.is_registered(_redraw_while_uploading):
+        bpy.app.timers.unregister(_redraw_while_uploading)
+    queue.shutdown()
+    bpy.utils.unregister_class(WM_OT_clear_failed_uploads)
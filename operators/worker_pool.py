@@ -0,0 +1,318 @@
+import bpy
+import collections
+import json
+import os
+import queue as queue_module
+import secrets
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bpy.app.handlers import persistent
+
+from . import asset_index
+from . import export_scheduler
+from .export_fbx import resolve_export_dir
+from .export_worker import PORT_PREFIX
+
+# ------------------------------
+# Background worker pool
+# ------------------------------
+#
+# `blender -b` processes that keep the exported .blend loaded and take export
+# commands over a localhost socket (see export_worker.py), so batch exports run
+# next to the UI instead of blocking it and skip Blender startup each time.
+# Workers load the saved file; a file with unsaved changes is first saved as a
+# snapshot copy, written again only after the scene changed. Workers are
+# recycled when the file they hold changes on disk; retired workers finish
+# their current export and quit in the background.
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "export_worker.py")
+SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), "UEFbxExporter", "worker_snapshot.blend")
+STARTUP_TIMEOUT = 120.0
+# Worker output lines kept for failure reports
+OUTPUT_TAIL = 20
+
+
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Worker:
+    def __init__(self, blend_path):
+        self.blend_path = blend_path
+        self.stamp = _file_stamp(blend_path)
+        self.token = secrets.token_hex(16)
+        self.port = None
+        self._lines = queue_module.Queue()
+        self.output = collections.deque(maxlen=OUTPUT_TAIL)
+        self.process = subprocess.Popen(
+            [bpy.app.binary_path, "-b", blend_path, "--python", WORKER_SCRIPT, "--", "--token", self.token],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        # Keep draining stdout so the worker never blocks on a full pipe
+        threading.Thread(target=self._drain, name="UEFbxWorkerOutput", daemon=True).start()
+
+    def _drain(self):
+        for raw in self.process.stdout:
+            line = raw.decode("utf-8", "replace").rstrip()
+            if self.port is None and line.startswith(PORT_PREFIX):
+                self._lines.put(int(line.split()[1]))
+            elif line:
+                self.output.append(line)
+
+    def tail(self):
+        """The last lines the worker printed, for failure reports"""
+        return "\n".join(self.output)
+
+    def wait_ready(self, timeout=STARTUP_TIMEOUT):
+        if self.port is None:
+            try:
+                self.port = self._lines.get(timeout=timeout)
+            except queue_module.Empty:
+                raise RuntimeError(f"worker did not start within {timeout:.0f} s")
+        return self
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def is_current(self, blend_path):
+        return self.alive() and self.blend_path == blend_path and self.stamp == _file_stamp(blend_path)
+
+    def request(self, message, timeout=None):
+        self.wait_ready()
+        message = dict(message, token=self.token)
+        with socket.create_connection(("127.0.0.1", self.port), timeout=timeout) as conn:
+            with conn.makefile("rwb") as stream:
+                stream.write(json.dumps(message).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+        if not line:
+            raise RuntimeError("worker closed the connection")
+        return json.loads(line)
+
+    def stop(self, timeout=5.0):
+        """Ask the worker to quit, killing it if it does not answer within `timeout` (None: wait)"""
+        if self.alive():
+            try:
+                self.request({"command": "quit"}, timeout=timeout)
+                self.process.wait(timeout=10.0)
+            except Exception:
+                self.process.kill()
+
+    def retire(self):
+        """Stop without blocking: the worker serves one command at a time, so a busy one ends its export first"""
+        threading.Thread(target=self.stop, kwargs={"timeout": None}, name="UEFbxWorkerStop", daemon=True).start()
+
+
+class WorkerPool:
+    def __init__(self):
+        self.workers = []
+        self._executor = None
+        self._executor_size = 0
+        # Cleared when a snapshot is written, set by scene changes (see the handlers below)
+        self.snapshot_stale = True
+
+    def blend_for_workers(self):
+        """Path the workers load: the saved file, or a snapshot copy when there are unsaved changes.
+        An up to date snapshot is reused, so its workers keep running"""
+        if bpy.data.filepath and not bpy.data.is_dirty:
+            return bpy.data.filepath
+        if self.snapshot_stale or not os.path.exists(SNAPSHOT_PATH):
+            os.makedirs(os.path.dirname(SNAPSHOT_PATH), exist_ok=True)
+            bpy.ops.wm.save_as_mainfile(filepath=SNAPSHOT_PATH, copy=True, relative_remap=True)
+            self.snapshot_stale = False
+        return SNAPSHOT_PATH
+
+    def ensure(self, count, blend_path):
+        """Start/recycle workers so `count` of them hold the current `blend_path`"""
+        current = [w for w in self.workers if w.is_current(blend_path)]
+        for worker in self.workers:
+            if worker not in current:
+                worker.retire()
+        while len(current) < count:
+            current.append(Worker(blend_path))
+        for worker in current[count:]:
+            worker.retire()
+        self.workers = current[:count]
+        if self._executor is None or self._executor_size < count:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ThreadPoolExecutor(max_workers=count, thread_name_prefix="UEFbxWorkerClient")
+            self._executor_size = count
+
+    def submit(self, batches, export_dir, prefs_values):
+        """One export request per worker; returns (worker, future) pairs"""
+        return [
+            (worker, self._executor.submit(
+                worker.request,
+                {"command": "export", "roots": roots, "export_dir": export_dir, "prefs": prefs_values},
+            ))
+            for worker, roots in zip(self.workers, batches)
+            if roots
+        ]
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._executor_size = 0
+
+
+pool = WorkerPool()
+
+
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    # Selection changes only update the scene itself and leave the snapshot valid
+    for update in depsgraph.updates:
+        if update.is_updated_geometry or update.is_updated_transform or not isinstance(update.id, bpy.types.Scene):
+            pool.snapshot_stale = True
+            return
+
+
+@persistent
+def _on_file_change(*args):
+    pool.snapshot_stale = True
+
+
+_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, _on_depsgraph_update_post),
+    (bpy.app.handlers.undo_post, _on_file_change),
+    (bpy.app.handlers.redo_post, _on_file_change),
+    (bpy.app.handlers.load_post, _on_file_change),
+)
+
+
+def prefs_values(prefs):
+    """Addon preferences as plain values for the workers"""
+    values = {}
+    for prop in prefs.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type in {'POINTER', 'COLLECTION'}:
+            continue
+        value = getattr(prefs, prop.identifier)
+        if prop.type == 'ENUM' and prop.is_enum_flag:
+            value = sorted(value)
+        elif hasattr(value, "__len__") and not isinstance(value, str):
+            value = list(value)
+        values[prop.identifier] = value
+    return values
+
+
+def balance(roots, count):
+    """Split roots over `count` workers by source mesh size, largest first onto the lightest worker"""
+    sizes = {
+        root: export_scheduler.mesh_footprint(asset_index.index.hierarchy(root), None)
+        for root in roots
+    }
+    batches = [[] for _ in range(count)]
+    loads = [0] * count
+    for root in sorted(roots, key=lambda r: sizes[r], reverse=True):
+        i = loads.index(min(loads))
+        batches[i].append(root.name)
+        loads[i] += sizes[root]
+    return batches
+
+
+def with_output(message, worker):
+    """`message` followed by the tail of the worker's output, which holds Blender's own errors"""
+    tail = worker.tail()
+    return f"{message}\n{tail}" if tail else message
+
+
+class OBJECT_OT_ExportUEFbxWorkers(bpy.types.Operator):
+    bl_idname = "export_scene.ue_fbx_workers"
+    bl_label = "Export in Background"
+    bl_description = (
+        "Export the selected roots in background Blender workers that keep this file loaded.\n"
+        "Unsaved changes are exported from a snapshot copy"
+    )
+
+    _timer = None
+    _futures = None
+    _start = 0.0
+
+    @classmethod
+    def poll(cls, context):
+        return bool(context.selected_objects)
+
+    def execute(self, context):
+        prefs = context.preferences.addons["UEFbxExporter"].preferences
+        if prefs.worker_count == 0:
+            # Background export disabled: export here
+            return bpy.ops.export_scene.ue_fbx()
+        export_dir = resolve_export_dir(context.scene, prefs)
+        if not export_dir:
+            self.report({'WARNING'}, "No export path set in preferences or scene. Please set a valid export path.")
+            return {'CANCELLED'}
+
+        roots = asset_index.index.roots(context.selected_objects)
+        count = max(1, min(prefs.worker_count, len(roots)))
+        try:
+            pool.ensure(count, pool.blend_for_workers())
+        except Exception as e:
+            self.report({'ERROR'}, f"Could not start export workers: {e}")
+            return {'CANCELLED'}
+
+        self._start = time.perf_counter()
+        self._futures = pool.submit(balance(roots, count), export_dir, prefs_values(prefs))
+        self._timer = context.window_manager.event_timer_add(0.25, window=context.window)
+        context.window_manager.modal_handler_add(self)
+        self.report({'INFO'}, f"Exporting {len(roots)} roots in {count} background workers")
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type != 'TIMER' or not all(f.done() for _, f in self._futures):
+            return {'PASS_THROUGH'}
+        context.window_manager.event_timer_remove(self._timer)
+
+        exported = failed = 0
+        for worker, future in self._futures:
+            try:
+                reply = future.result()
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            if "results" not in reply:
+                failed += 1
+                self.report({'ERROR'}, with_output(f"Export worker failed: {reply.get('error')}", worker))
+                continue
+            for result in reply["results"]:
+                if result["ok"]:
+                    exported += 1
+                    self.report({'INFO'}, f"{result['root']}: {result['time']:.2f} s")
+                else:
+                    failed += 1
+                    self.report({'ERROR'}, with_output(f"{result['root']}: {result['error']}", worker))
+        elapsed = time.perf_counter() - self._start
+        level = {'WARNING'} if failed else {'INFO'}
+        self.report(level, f"Background export: {exported} exported, {failed} failed in {elapsed:.1f} s")
+        return {'FINISHED'}
+
+# ------------------------------
+# Registration
+# ------------------------------
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_ExportUEFbxWorkers)
+    for handlers, handler in _handlers:
+        if handler not in handlers:
+            handlers.append(handler)
+
+
+def unregister():
+    for handlers, handler in _handlers:
+        if handler in handlers:
+            handlers.remove(handler)
+    pool.shutdown()
+    bpy.utils.unregister_class(OBJECT_OT_ExportUEFbxWorkers)
@@ -29,9 +29,11 @@ import time
 from struct import pack, unpack
 import string
 import numpy
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from bpy.types import Operator
 from bpy.props import EnumProperty
 from bpy.app.translations import pgettext_iface as iface_
+from . import goz_reader
 
 def prefs():
     user_preferences = bpy.context.preferences
@@ -68,7 +70,9 @@ icons = None
 cached_last_edition_time = time.perf_counter()
 last_cache = 0
 preview_collections = {}
-gob_import_cache = []
+gob_import_cache = goz_reader.ImportCache()
+# GoZ files read and decoded at once (see parse_goz)
+PARSE_WORKERS = min(8, os.cpu_count() or 4)
 
 def draw_goz_buttons(self, context):
     global run_background_update, icons
@@ -106,496 +110,186 @@ class GoB_OT_import(Operator):
     )
 
 
-    def GoZit(self, pathFile): 
+    def GoZit(self, goz): 
+        """Build or update the object of a parsed GoZ file (GoZData), on the main thread"""
         if prefs().performance_profiling: 
             print("\n")
+            print(f"GoB Importing: {goz.name}")
+            print("{:.10f}".format(goz.parseTime*1000), "ms << Read and Decode (worker thread)")
             start_time = profiler(time.perf_counter(), "Start Object Profiling")
             start_total_time = profiler(time.perf_counter(), "...")
 
-        utag = 0
-        vertsData = []
-        facesData = []
         objMat = None
         diff, disp, norm =  None, None, None
-        exists = os.path.isfile(pathFile)
-        if not exists:
-            print(f'Cant read mesh from: {pathFile}. Skipping')
-            return
-        
-        with open(pathFile, 'rb') as goz_file:
-            goz_file.seek(36, 0)
-            lenObjName = unpack('<I', goz_file.read(4))[0] - 16
-            goz_file.seek(8, 1)
-            obj_name = unpack('%ss' % lenObjName, goz_file.read(lenObjName))[0]
-            # remove non ascii chars eg. /x 00
-            objName = ''.join([letter for letter in obj_name[8:].decode('utf-8') if letter in string.printable])
-            if prefs().debug_output:
-                print(f"Importing: {pathFile, objName}")  
-            if prefs().performance_profiling:                
-                print(f"GoB Importing: {objName}")            
-            tag = goz_file.read(4)
-            
-            while tag:                
-                # Name
-                if tag == b'\x89\x13\x00\x00':
-                    if prefs().debug_output:
-                        print("name:", tag)
-                    cnt = unpack('<L', goz_file.read(4))[0] - 8
-                    goz_file.seek(cnt, 1)
-
-                # Vertices
-                elif tag == b'\x11\x27\x00\x00':  
-                    if prefs().debug_output:
-                        print("Vertices:", tag)                    
-                    goz_file.seek(4, 1)
-                    cnt = unpack('<Q', goz_file.read(8))[0]
-                    for i in range(cnt):
-                        co1 = unpack('<f', goz_file.read(4))[0]
-                        co2 = unpack('<f', goz_file.read(4))[0]
-                        co3 = unpack('<f', goz_file.read(4))[0]
-                        vertsData.append((co1, co2, co3))
-                
-                # Faces
-                elif tag == b'\x21\x4e\x00\x00':  
-                    if prefs().debug_output:
-                        print("Faces:", tag)
-                    goz_file.seek(4, 1)
-                    cnt = unpack('<Q', goz_file.read(8))[0]
-                    for i in range(cnt):
-                        v1 = unpack('<L', goz_file.read(4))[0]
-                        v2 = unpack('<L', goz_file.read(4))[0]
-                        v3 = unpack('<L', goz_file.read(4))[0]
-                        v4 = unpack('<L', goz_file.read(4))[0]
-                        if v4 == 0xffffffff:
-                            facesData.append((v1, v2, v3))
-                        elif v4 == 0:
-                            facesData.append((v4, v1, v2, v3))
-                        else:
-                            facesData.append((v1, v2, v3, v4))
-                # UVs
-                elif tag == b'\xa9\x61\x00\x00':  
-                    if prefs().debug_output:
-                        print("UVs:", tag)
-                    break
-                # Polypainting
-                elif tag == b'\xb9\x88\x00\x00':  
-                    if prefs().debug_output:
-                        print("Polypainting:", tag)
-                    break
-                # Mask
-                elif tag == b'\x32\x75\x00\x00':  
-                    if prefs().debug_output:
-                        print("Mask:", tag)
-                    break
-                # Polyroups
-                elif tag == b'\x41\x9c\x00\x00': 
-                    if prefs().debug_output:
-                        print("Polyroups:", tag) 
-                    break
-                # End
-                elif tag == b'\x00\x00\x00\x00':  
-                    if prefs().debug_output:
-                        print("End:", tag)
-                    break
-                # Unknown tags
-                else:
-                    print("Unknown tag:{0}".format(tag))
-                    if utag >= 10:
-                        if prefs().debug_output:
-                            print("...Too many mesh tags unknown...\n")
-                        break
-                    utag += 1
-                    cnt = unpack('<I', goz_file.read(4))[0] - 8
-                    goz_file.seek(cnt, 1)
-                tag = goz_file.read(4)
-                
-            if prefs().performance_profiling:  
-                start_time = profiler(start_time, "Unpack Mesh Data")
-
-            # create new object
-            if not objName in bpy.data.objects.keys():
-                me = bpy.data.meshes.new(objName)  
-                obj = bpy.data.objects.new(objName, me)
-                bpy.context.view_layer.active_layer_collection.collection.objects.link(obj) 
-                me.from_pydata(vertsData, [], facesData)     
-                #me.transform(obj.matrix_world.inverted())      
-           
-            # object already exist
-            else:                
-                obj = bpy.data.objects[objName]                
-                me = obj.data
-                #mesh has same vertex count
-                if len(me.vertices) == len(vertsData): 
-                    bm = bmesh.new()
-                    bm.from_mesh(me)
-                    bm.faces.ensure_lookup_table() 
-                    #update vertex positions
-                    for i, v in enumerate(bm.verts):
-                        v.co  = mathutils.Vector(vertsData[i])  
-                    bm.to_mesh(me)   
-                    bm.free()
-
-                #mesh has different vertex count
-                else:              
-                    me.clear_geometry() #NOTE: if this is done in edit mode we get a crash                         
-                    me.from_pydata(vertsData, [], facesData)
-                    #obj.data = me
-           
-            me,_ = apply_transformation(me, is_import=True)
-            # assume we have to reverse transformation from obj mode, this is needed after matrix transfomrmations      
-            me.transform(obj.matrix_world.inverted())         
-           
-            # update mesh data after transformations to fix normals 
+        objName = goz.name
+        if prefs().debug_output:
+            print(f"Importing: {goz.path, objName}")  
+            print("Tags:", [hex(tag) for tag in goz.reader.index])
+            if goz.reader.unknown_tags:
+                print("Unknown tags:", [hex(tag) for tag in goz.reader.unknown_tags])
+
+        sameTopology = False
+        # create new object
+        if not objName in bpy.data.objects.keys():
+            me = bpy.data.meshes.new(objName)  
+            obj = bpy.data.objects.new(objName, me)
+            bpy.context.view_layer.active_layer_collection.collection.objects.link(obj) 
+            fill_goz_mesh(me, goz.verts, goz.corners, goz.sizes)
+            #me.transform(obj.matrix_world.inverted())      
+       
+        # object already exist
+        else:                
+            obj = bpy.data.objects[objName]                
+            me = obj.data
+            #mesh has same topology: only positions change (sculpt round-trip)
+            sameTopology = same_goz_topology(me, goz.storedCorners, goz.sizes)
+            if sameTopology:
+                me.vertices.foreach_set("co", goz.verts.ravel())
+
+            #mesh has different topology
+            else:              
+                me.clear_geometry() #NOTE: if this is done in edit mode we get a crash                         
+                fill_goz_mesh(me, goz.verts, goz.corners, goz.sizes)
+                #obj.data = me
+       
+        # the winding of an unchanged topology is already flipped
+        me,_ = apply_transformation(me, is_import=True, flip_normals=not sameTopology)
+        # assume we have to reverse transformation from obj mode, this is needed after matrix transfomrmations      
+        me.transform(obj.matrix_world.inverted())         
+       
+        if sameTopology:
+            # faces and edges are the ones already validated, only normals need an update
+            me.update()
+        else:
+            # update mesh data after transformations to fix normals, edges are built by fill_goz_mesh
             me.validate(verbose=True)
-            me.update(calc_edges=True, calc_edges_loose=True) 
-            
-            # make object active
-            obj.select_set(state=True) 
-            bpy.context.view_layer.objects.active = obj
-
-            vertsData.clear()
-            facesData.clear()
+            me.update(calc_edges_loose=True) 
+        
+        # make object active
+        obj.select_set(state=True) 
+        bpy.context.view_layer.objects.active = obj
 
-            if prefs().performance_profiling:  
-                start_time = profiler(start_time, "Make Mesh")
-                
+        if prefs().performance_profiling:  
+            start_time = profiler(start_time, "Make Mesh")
             
-            utag = 0
-            while tag:
-                
-                # UVs
-                if tag == b'\xa9\x61\x00\x00':                    
-                    if prefs().debug_output:
-                        print("Import UV: ", prefs().import_uv)
-
-                    if prefs().import_uv:  
-                        goz_file.seek(4, 1)
-                        cnt = unpack('<Q', goz_file.read(8))[0]     # face count                        
-                        bm = bmesh.new()
-                        bm.from_mesh(me) 
-                        bm.faces.ensure_lookup_table()
-
-                        if me.uv_layers:
-                            if prefs().import_uv_name in me.uv_layers:                            
-                                uv_layer = bm.loops.layers.uv.get(prefs().import_uv_name)
-                            else:
-                                uv_layer = bm.loops.layers.uv.new(prefs().import_uv_name)
-                        else:
-                            uv_layer = bm.loops.layers.uv.new(prefs().import_uv_name) 
-                        uv_layer = bm.loops.layers.uv.verify()
-
-                        for face in bm.faces:
-                            for index, loop in enumerate(face.loops):            
-                                x, y = unpack('<2f', goz_file.read(8)) 
-                                loop[uv_layer].uv = x, 1.0-y
-                            #uv's always have 4 coords so its required to read one more if a trinalge is in the mesh
-                            # zbrush seems to always write out 4 coords            
-                            if index < 3:       
-                                x, y = unpack('<2f', goz_file.read(8))
-
-                        bm.to_mesh(me)   
-                        bm.free()    
-                                           
-                        me.update(calc_edges=True, calc_edges_loose=True)  
-                        if prefs().performance_profiling: 
-                            start_time = profiler(start_time, "UV Map") 
-                    else:
-                        utag += 1
-                        cnt = unpack('<I', goz_file.read(4))[0] - 8
-                        goz_file.seek(cnt, 1)
-                        
-
-                # Polypainting
-                elif tag == b'\xb9\x88\x00\x00': 
-                    if prefs().debug_output:
-                        print("Import Polypaint: ", prefs().import_polypaint)  
-
-                    if prefs().import_polypaint:
-                        goz_file.seek(4, 1)
-                        cnt = unpack('<Q', goz_file.read(8))[0]  
-                        polypaintData = []
-                        for i in range(cnt): 
-                            colordata = unpack('<3B', goz_file.read(3)) # Color
-                            unpack('<B', goz_file.read(1))  # Alpha
-                            alpha = 1                        
-
-                            #convert color to vector                         
-                            rgb = [x / 255.0 for x in colordata]    
-                            rgb.reverse()                    
-                            rgba = rgb + [alpha]                                          
-                            polypaintData.append(tuple(rgba))                      
-                        
-                        if prefs().performance_profiling: 
-                            start_time = profiler(start_time, "Polypaint Unpack")
-
-                        if colordata:                   
-                            bm = bmesh.new()
-                            bm.from_mesh(me)
-                            bm.faces.ensure_lookup_table()
-                            if me.vertex_colors:                            
-                                if prefs().import_polypaint_name in me.vertex_colors: 
-                                    color_layer = bm.loops.layers.color.get(prefs().import_polypaint_name)
-                                else:
-                                    color_layer = bm.loops.layers.color.new(prefs().import_polypaint_name)                                    
-                            else:
-                                color_layer = bm.loops.layers.color.new(prefs().import_polypaint_name)                
-                            
-                            for face in bm.faces:
-                                for loop in face.loops:
-                                    loop[color_layer] = polypaintData[loop.vert.index]
-
-                            bm.to_mesh(me)                        
-                            me.update(calc_edges=True, calc_edges_loose=True)  
-                            bm.free()
-                            
-                        polypaintData.clear()    
-                        if prefs().performance_profiling: 
-                            start_time = profiler(start_time, "Polypaint Assign")
-                    else:
-                        utag += 1
-                        cnt = unpack('<I', goz_file.read(4))[0] - 8
-                        goz_file.seek(cnt, 1)
-
-                # Mask
-                elif tag == b'\x32\x75\x00\x00':   
-                    if prefs().debug_output:
-                        print("Import Mask: ", prefs().import_mask)
-                    
-                    
-                    if prefs().import_mask:
-                        goz_file.seek(4, 1)
-                        cnt = unpack('<Q', goz_file.read(8))[0]
-
-                        if 'mask' in obj.vertex_groups:
-                            obj.vertex_groups.remove(obj.vertex_groups['mask'])
-                        groupMask = obj.vertex_groups.new(name='mask')
-
-                        for faceIndex in range(cnt):
-                            weight = unpack('<H', goz_file.read(2))[0] / 65535                          
-                            groupMask.add([faceIndex], 1.-weight, 'ADD')  
-
-                        if prefs().performance_profiling: 
-                            start_time = profiler(start_time, "Mask")
-                    else:
-                        utag += 1
-                        cnt = unpack('<I', goz_file.read(4))[0] - 8
-                        goz_file.seek(cnt, 1)
-
-                # Polyroups
-                elif tag == b'\x41\x9c\x00\x00':   
-                    if prefs().debug_output:
-                        print("Import Polyroups: ", prefs().import_polygroups_to_vertexgroups, prefs().import_polygroups_to_facemaps)
-                    
-                    #wipe face maps before importing new ones due to random naming
-                    if prefs().import_polygroups_to_facemaps:              
-                        [obj.face_maps.remove(facemap) for facemap in obj.face_maps]
-
-
-                    groupsData = []
-                    facemapsData = []
-                    goz_file.seek(4, 1)
-                    cnt = unpack('<Q', goz_file.read(8))[0]     # get polygroup faces
-                    #print("polygroup data:", cnt)
-                    
-                    for i in range(cnt):    # faces of each polygroup
-                        group = unpack('<H', goz_file.read(2))[0]
-                        #print("polygroup data:", i, group, hex(group))
-
-                        # vertex groups import
-                        if prefs().import_polygroups_to_vertexgroups:
-                            if group not in groupsData: #this only works if mask is already there
-                                if str(group) in obj.vertex_groups:
-                                    obj.vertex_groups.remove(obj.vertex_groups[str(group)])
-                                vg = obj.vertex_groups.new(name=str(group))
-                                groupsData.append(group)
-                            else:
-                                vg = obj.vertex_groups[str(group)]
-                            
-                            try:    #if vg assignment failes the mesh has some bad elements
-                                vg.add(list(me.polygons[i].vertices), 1.0, 'ADD')    # add vertices to vertex group
-                            except:
-                                print(str(group), "index out of range, check Mesh Integrity in ZBrush \nhttp://docs.pixologic.com/reference-guide/tool/polymesh/geometry/#mesh-integrity")
-
-                        # Face maps import
-                        if prefs().import_polygroups_to_facemaps:
-                            if group not in facemapsData:
-                                if str(group) in obj.face_maps:
-                                    obj.face_maps.remove(obj.face_maps[str(group)])
-                                faceMap = obj.face_maps.new(name=str(group))
-                                facemapsData.append(group)
-                            else:                        
-                                faceMap = obj.face_maps[str(group)] 
-
-                            try:
-                                if obj.data.polygons[i]:
-                                    faceMap.add([i])     # add faces to facemap
-                            except:
-                                pass
-                            
-                            
-                    try:
-                        #print("VGs: ", obj.vertex_groups.get('0'))
-                        obj.vertex_groups.remove(obj.vertex_groups.get('0'))
-                    except:
-                        pass
-
-                    try:
-                        #print("FMs: ", obj.face_maps.get('0'))
-                        obj.face_maps.remove(obj.face_maps.get('0'))
-                    except:
-                        pass
-                    
-                    groupsData.clear()
-                    facemapsData.clear()
+        # UVs
+        if goz.uvs is not None:
+            if len(goz.uvs) == len(me.loops):
+                uv_layer = me.uv_layers.get(prefs().import_uv_name)
+                if uv_layer is None:
+                    uv_layer = me.uv_layers.new(name=prefs().import_uv_name)
+                me.uv_layers.active = uv_layer
+                uv_layer.data.foreach_set("uv", goz.uvs.ravel())
+            else:
+                print(f"UVs of {objName} don't match its faces, skipping them")
+            if prefs().performance_profiling: 
+                start_time = profiler(start_time, "UV Map") 
+
+        # Polypainting
+        if goz.colors is not None:
+            if len(goz.colors) == len(me.vertices):
+                color_layer = me.color_attributes.get(prefs().import_polypaint_name)
+                if color_layer is not None and (color_layer.domain != 'POINT' or color_layer.data_type != 'BYTE_COLOR'):
+                    me.color_attributes.remove(color_layer)
+                    color_layer = None
+                if color_layer is None:
+                    color_layer = me.color_attributes.new(prefs().import_polypaint_name, 'BYTE_COLOR', 'POINT')
+                me.color_attributes.active_color = color_layer
+                # bytes as they are, like ZBrush shows them
+                # (N, 4) RGBA bytes until here: converted only for the call
+                color_layer.data.foreach_set("color_srgb", goz.colors.ravel() / numpy.float32(255.0))
+            else:
+                print(f"Polypaint of {objName} doesn't match its vertices, skipping it")
+            if prefs().performance_profiling: 
+                start_time = profiler(start_time, "Polypaint")
 
-                    if prefs().performance_profiling: 
-                        start_time = profiler(start_time, "Polyroups")
+        # Mask
+        if goz.mask is not None:
+            if len(goz.mask) == len(me.vertices):
+                import_goz_mask(obj, goz.mask)
+            else:
+                print(f"Mask of {objName} doesn't match its vertices, skipping it")
+            if prefs().performance_profiling: 
+                start_time = profiler(start_time, "Mask")
 
-                # End
-                elif tag == b'\x00\x00\x00\x00': 
-                    break
-                
-                # Diffuse Texture 
-                elif tag == b'\xc9\xaf\x00\x00':  
-                    if prefs().debug_output:
-                        print("Diff map:", tag)
-                    texture_name = (obj.name + prefs().import_diffuse_suffix)
-                    cnt = unpack('<I', goz_file.read(4))[0] - 16
-                    goz_file.seek(8, 1)
-                    diffName = unpack('%ss' % cnt, goz_file.read(cnt))[0]
-                    if prefs().debug_output:
-                        print(diffName.decode('utf-8'))
-                    img = bpy.data.images.load(diffName.strip().decode('utf-8'), check_existing=True) 
-                    img.name = texture_name                                        
-                    img.reload()
-                    
-                    if not texture_name in bpy.data.textures:
-                        txtDiff = bpy.data.textures.new(texture_name, 'IMAGE')
-                        txtDiff.image = img            
-                    diff = img
-                
+        # Polyroups
+        if goz.groups is not None:
+            # face maps are gone in 4.x: polygroups become sculpt face sets
+            toFaceSets = prefs().import_polygroups_to_facemaps or prefs().apply_facemaps_to_facesets
+            if prefs().debug_output:
+                print("Import Polyroups: ", prefs().import_polygroups_to_vertexgroups, toFaceSets)
+            if len(goz.groups) == len(me.polygons):
+                import_goz_polygroups(obj, goz.groups, toFaceSets, prefs().import_polygroups_to_vertexgroups)
+            else:
+                print(f"Polygroups of {objName} don't match its faces, check Mesh Integrity in ZBrush \nhttp://docs.pixologic.com/reference-guide/tool/polymesh/geometry/#mesh-integrity")
 
-                # Displacement Texture 
-                elif tag == b'\xd9\xd6\x00\x00':  
-                    if prefs().debug_output:
-                        print("Disp map:", tag)
-                    texture_name = (obj.name + prefs().import_displace_suffix)
-                    cnt = unpack('<I', goz_file.read(4))[0] - 16
-                    goz_file.seek(8, 1)
-                    dispName = unpack('%ss' % cnt, goz_file.read(cnt))[0]                    
-                    if prefs().debug_output:
-                        print(dispName.decode('utf-8'))                    
-                    img = bpy.data.images.load(dispName.strip().decode('utf-8'), check_existing=True)  
-                    img.name = texture_name                                       
-                    img.reload()
-
-                    if not texture_name in bpy.data.textures:
-                        txtDisp = bpy.data.textures.new(texture_name, 'IMAGE')
-                        txtDisp.image = img
-                    disp = img
-
-                # Normal Map Texture
-                elif tag == b'\x51\xc3\x00\x00':   
-                    if prefs().debug_output:
-                        print("Normal map:", tag)
-                    texture_name = (obj.name + prefs().import_normal_suffix)
-                    cnt = unpack('<I', goz_file.read(4))[0] - 16
-                    goz_file.seek(8, 1)
-                    normName = unpack('%ss' % cnt, goz_file.read(cnt))[0]
-                    if prefs().debug_output:
-                        print(normName.decode('utf-8'))
-                    img = bpy.data.images.load(normName.strip().decode('utf-8'), check_existing=True) 
-                    img.name = texture_name                                       
-                    img.reload()
-                    
-                    if not texture_name in bpy.data.textures:
-                        txtNorm = bpy.data.textures.new(texture_name, 'IMAGE')
-                        txtNorm.image = img
-                    norm = img
-                
-                # Unknown tags
-                else: 
-                    if prefs().debug_output:
-                        print("Unknown tag:{0}".format(tag))
-                    if utag >= 10:
-                        if prefs().debug_output:
-                            print("...Too many object tags unknown...\n")
-                        break
-                    utag += 1
-                    cnt = unpack('<I', goz_file.read(4))[0] - 8
-                    goz_file.seek(cnt, 1)
-
-                tag = goz_file.read(4)
-                
-            if prefs().performance_profiling:                
-                start_time = profiler(start_time, "Textures")
+            if prefs().performance_profiling: 
+                start_time = profiler(start_time, "Polyroups")
+
+        # Textures: diffuse, displacement and normal map
+        textures = (
+            (goz_reader.TAG_DIFFUSE, prefs().import_diffuse_suffix, "Diff map:"),
+            (goz_reader.TAG_DISPLACEMENT, prefs().import_displace_suffix, "Disp map:"),
+            (goz_reader.TAG_NORMAL, prefs().import_normal_suffix, "Normal map:"),
+        )
+        images = []
+        for tag, suffix, label in textures:
+            texturePath = goz.textures.get(tag)
+            if texturePath is None:
+                images.append(None)
+                continue
+            if prefs().debug_output:
+                print(label, texturePath)
+            texture_name = (obj.name + suffix)
+            img = bpy.data.images.load(texturePath, check_existing=True) 
+            img.name = texture_name                                        
+            img.reload()
             
-            # Materials
-            if prefs().import_material == 'NONE':
-                if prefs().debug_output:
-                    print("Import Material: ", prefs().import_material) 
-            else:
-                
-                if len(obj.material_slots) > 0:
-                    #print("material slot: ", obj.material_slots[0])
-                    if obj.material_slots[0].material is not None:
-                        objMat = obj.material_slots[0].material
-                    else:
-                        objMat = bpy.data.materials.new(objName)
-                        obj.material_slots[0].material = objMat
+            if not texture_name in bpy.data.textures:
+                txt = bpy.data.textures.new(texture_name, 'IMAGE')
+                txt.image = img            
+            images.append(img)
+        diff, disp, norm = images
+            
+        if prefs().performance_profiling:                
+            start_time = profiler(start_time, "Textures")
+        
+        # Materials
+        if prefs().import_material == 'NONE':
+            if prefs().debug_output:
+                print("Import Material: ", prefs().import_material) 
+        else:
+            
+            if len(obj.material_slots) > 0:
+                #print("material slot: ", obj.material_slots[0])
+                if obj.material_slots[0].material is not None:
+                    objMat = obj.material_slots[0].material
                 else:
                     objMat = bpy.data.materials.new(objName)
-                    obj.data.materials.append(objMat)
+                    obj.material_slots[0].material = objMat
+            else:
+                objMat = bpy.data.materials.new(objName)
+                obj.data.materials.append(objMat)
 
-                if prefs().import_material == 'POLYPAINT':                    
-                    if prefs().import_polypaint_name in me.vertex_colors:
-                        create_material_node(objMat, diff, norm, disp)  
-                    
-                elif prefs().import_material == 'TEXTURES':
-                    create_material_node(objMat, diff, norm, disp)  
-                    
-                elif prefs().import_material == 'POLYGROUPS':
+            if prefs().import_material == 'POLYPAINT':                    
+                if prefs().import_polypaint_name in me.color_attributes:
                     create_material_node(objMat, diff, norm, disp)  
-          
-            if prefs().performance_profiling: 
-                start_time = profiler(start_time, "Material Node")
                 
-
-            # #apply face maps to sculpt mode face sets
-            if prefs().apply_facemaps_to_facesets and  bpy.app.version > (2, 82, 7):                
-                bpy.ops.object.mode_set(bpy.context.copy(), mode='SCULPT')                 
-                for window in bpy.context.window_manager.windows:
-                    screen = window.screen
-                    for area in screen.areas:
-                        if area.type == 'VIEW_3D':
-                            override = {'window': window, 'screen': screen, 'area': area}
-                            bpy.ops.sculpt.face_sets_init(override, mode='FACE_MAPS')   
-                            break                   
-                if prefs().performance_profiling:                
-                    start_time = profiler(start_time, "Init Face Sets")
-
-                # reveal all mesh elements (after the override for the face maps the elements without faces are hidden)                                 
-                bpy.ops.object.mode_set(bpy.context.copy(), mode='EDIT') 
-                for window in bpy.context.window_manager.windows:
-                    screen = window.screen
-                    for area in screen.areas:
-                        if area.type == 'VIEW_3D':
-                            override = {'window': window, 'screen': screen, 'area': area}
-                            bpy.ops.mesh.reveal(override)
-                            break  
-
-                if prefs().performance_profiling:                
-                    start_time = profiler(start_time, "Reveal Mesh Elements")
-                                           
-            if prefs().performance_profiling: 
-                print(30*"-") 
-                profiler(start_total_time, "Object Import Time")  
-                print(30*"-")                
-        return
+            elif prefs().import_material == 'TEXTURES':
+                create_material_node(objMat, diff, norm, disp)  
+                
+            elif prefs().import_material == 'POLYGROUPS':
+                create_material_node(objMat, diff, norm, disp)  
+      
+        if prefs().performance_profiling: 
+            start_time = profiler(start_time, "Material Node")
+            print(30*"-") 
+            profiler(start_total_time, "Object Import Time")  
+            print(30*"-")                
+        return obj
              
 
     def execute(self, context):
-        global gob_import_cache
         goz_obj_paths = []             
         try:
             with open(os.path.join(f"{PATH_GOZ}/GoZBrush/GoZ_ObjectList.txt"), 'rt') as goz_objs_list:
@@ -605,7 +299,7 @@ class GoB_OT_import(Operator):
             if prefs().debug_output:
                 print("GoB: GoZ_ObjectList already in use! Try again Later")
 
-        # Goz wipes this file before each export so it can be used to reset the import cache
+        # Goz wipes this file before each export
         if not goz_obj_paths:
             if prefs().debug_output:
                 self.report({'INFO'}, message="GoB: No goz files in GoZ_ObjectList") 
@@ -628,15 +322,48 @@ class GoB_OT_import(Operator):
             start_time = profiler(time.perf_counter(), "GoB: Start Import Profiling")             
             print(100*"-") 
 
+        # skip subtools whose file and object are unchanged since they were imported
+        pathsToImport = []
+        fileKeys = {}
+        for ztool_path in goz_obj_paths:
+            key = goz_reader.file_key(ztool_path)
+            if key is not None:
+                imported = gob_import_cache.lookup(key)
+                if imported is not None and goz_import_unchanged(*imported):
+                    if prefs().debug_output:
+                        print(f"GoB: {ztool_path} unchanged, skipping")
+                    continue
+                fileKeys[ztool_path] = key
+            pathsToImport.append(ztool_path)
+
+        # files are read and decoded in worker threads, objects are built here as files finish
+        settings = goz_import_settings()
         wm = context.window_manager
-        wm.progress_begin(0,100)   
-        step =  100  / len(goz_obj_paths)
-        for i, ztool_path in enumerate(goz_obj_paths):              
-            if not ztool_path in gob_import_cache:
-                gob_import_cache.append(ztool_path)
-                self.GoZit(ztool_path)            
-            wm.progress_update(step * i)               
-        wm.progress_end()
+        wm.progress_begin(0, max(len(pathsToImport), 1))
+        with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, max(len(pathsToImport), 1)),
+                                thread_name_prefix="GoBParse") as executor:
+            futures = {executor.submit(parse_goz, path, settings): path for path in pathsToImport}
+            consumed = set()
+            try:
+                for done, future in enumerate(as_completed(futures), 1):
+                    consumed.add(future)
+                    goz = parsed_goz(future, futures[future])
+                    if goz is not None:
+                        try:
+                            obj = self.GoZit(goz)
+                        finally:
+                            goz.close()
+                        if goz.path in fileKeys:
+                            gob_import_cache.remember(fileKeys[goz.path], obj.name_full, goz_mesh_fingerprint(obj))
+                    wm.progress_update(done)
+            finally:
+                # after an error, files parsed but not built are still open (ZBrush can't overwrite them on Windows)
+                for future in futures:
+                    if future not in consumed and not future.cancel():
+                        goz = parsed_goz(future, futures[future])
+                        if goz is not None:
+                            goz.close()
+                wm.progress_end()
         if prefs().debug_output:
             self.report({'INFO'}, "GoB: Imoprt cycle finished")
             
@@ -1376,14 +1103,12 @@ class GOB_OT_Popup(Operator):
 
 
 def run_import_manually():
-    global gob_import_cache
     window = bpy.context.window_manager.windows[0]
     context = {'window': window, 'screen': window.screen, 'workspace': window.workspace}
     bpy.ops.scene.gob_import(context) #only call operator update is found (executing operatros is slow)
     
 
 def run_import_periodically():
-    global gob_import_cache
     # print("Runing timers update check")
     global cached_last_edition_time, run_background_update
 
@@ -1405,13 +1130,7 @@ def run_import_periodically():
         context = {'window': window, 'screen': window.screen, 'workspace': window.workspace}
         bpy.ops.scene.gob_import(context) #only call operator update is found (executing operatros is slow)
     else:         
-        if gob_import_cache:  
-            if prefs().debug_output:   
-                print("GOZ: clear import cache", file_edition_time - cached_last_edition_time)
-            gob_import_cache.clear()   #reset import cache
-        else:
-            #print("GOZ: Nothing to update", file_edition_time - cached_last_edition_time)
-            pass    
+        #print("GOZ: Nothing to update", file_edition_time - cached_last_edition_time)
         return prefs().import_timer       
     
     if not run_background_update and bpy.app.timers.is_registered(run_import_periodically):
@@ -1498,7 +1217,218 @@ def create_material_node(mat, diff=None, norm=None, disp=None):
             mat.node_tree.links.new(shader_node.inputs[0], vcol_node.outputs[0])
 
 
-def apply_transformation(me, is_import=True): 
+def goz_corner_values(values, triMask, flipped=False):
+    """Per-corner rows of per-face GoZ values (F, 4, ...) in mesh corner order: the padding slot of
+    triangles is dropped and, with `flipped`, the winding is reversed like Mesh.flip_normals does
+    (first corner kept)"""
+    if flipped:
+        tri = triMask.reshape((-1,) + (1,) * (values.ndim - 1))
+        values = numpy.where(tri, values[:, [0, 2, 1, 3]], values[:, [0, 3, 2, 1]])
+    sizes = numpy.where(triMask, 3, 4)
+    # row-major mask keeps the corner order of every face
+    return values[numpy.arange(4) < sizes[:, None]]
+
+
+def goz_corners(facesData, triMask, flipped=False):
+    """(corner vertex indices, face sizes) of decoded GoZ faces"""
+    corners = goz_corner_values(facesData, triMask, flipped).astype(numpy.int32)
+    return corners, numpy.where(triMask, 3, 4).astype(numpy.int32)
+
+
+def same_goz_topology(me, corners, sizes):
+    """True when `me` already has exactly these faces, compared as flat index arrays"""
+    if len(me.loops) != len(corners) or len(me.polygons) != len(sizes):
+        return False
+    current = numpy.empty(len(sizes), dtype=numpy.int32)
+    me.polygons.foreach_get("loop_total", current)
+    if not numpy.array_equal(current, sizes):
+        return False
+    current = numpy.empty(len(corners), dtype=numpy.int32)
+    me.loops.foreach_get("vertex_index", current)
+    return numpy.array_equal(current, corners)
+
+
+def import_goz_mask(obj, mask):
+    """Store per-vertex `mask` (0-1 float32) as the 'mask' vertex group.
+    One add() per distinct mask value instead of one per vertex: ZBrush stores 16 bit masks,
+    so there are at most 65536 of them and weights keep their full precision"""
+    if 'mask' in obj.vertex_groups:
+        obj.vertex_groups.remove(obj.vertex_groups['mask'])
+    groupMask = obj.vertex_groups.new(name='mask')
+    order = numpy.argsort(mask, kind='stable')
+    values, starts = numpy.unique(mask[order], return_index=True)
+    for value, indices in zip(values.tolist(), numpy.split(order, starts[1:])):
+        # unmasked vertices stay out of the group
+        if value:
+            groupMask.add(indices.tolist(), value, 'REPLACE')
+
+
+def import_goz_polygroups(obj, groups, toFaceSets=True, toVertexGroups=False):
+    """Per-face polygroup IDs as the '.sculpt_face_set' attribute and/or one vertex group per ID.
+    Group 0 is "no group" in ZBrush and gets no vertex group"""
+    me = obj.data
+    if toFaceSets:
+        attr = me.attributes.get('.sculpt_face_set')
+        if attr is not None and (attr.domain != 'FACE' or attr.data_type != 'INT'):
+            me.attributes.remove(attr)
+            attr = None
+        if attr is None:
+            attr = me.attributes.new('.sculpt_face_set', 'INT', 'FACE')
+        attr.data.foreach_set("value", groups)
+
+    if toVertexGroups:
+        sizes = numpy.empty(len(me.polygons), dtype=numpy.int32)
+        me.polygons.foreach_get("loop_total", sizes)
+        corners = numpy.empty(len(me.loops), dtype=numpy.int32)
+        me.loops.foreach_get("vertex_index", corners)
+        # unique (group, vertex) pairs, sorted by group
+        pairs = numpy.unique(numpy.stack((numpy.repeat(groups, sizes), corners), axis=1), axis=0)
+        ids, starts = numpy.unique(pairs[:, 0], return_index=True)
+        for group, vertices in zip(ids.tolist(), numpy.split(pairs[:, 1], starts[1:])):
+            if group == 0:
+                continue
+            if str(group) in obj.vertex_groups:
+                obj.vertex_groups.remove(obj.vertex_groups[str(group)])
+            obj.vertex_groups.new(name=str(group)).add(vertices.tolist(), 1.0, 'REPLACE')
+
+
+def fill_goz_mesh(me, vertsData, corners, sizes):
+    """Fill an empty mesh from decoded GoZ arrays with bulk foreach_set calls"""
+    starts = numpy.zeros(len(sizes), dtype=numpy.int32)
+    numpy.cumsum(sizes[:-1], out=starts[1:])
+
+    me.vertices.add(len(vertsData))
+    me.loops.add(len(corners))
+    me.polygons.add(len(sizes))
+    me.vertices.foreach_set("co", vertsData.ravel())
+    me.loops.foreach_set("vertex_index", corners)
+    # face sizes follow from the offsets (loop_total is read-only since 4.0)
+    me.polygons.foreach_set("loop_start", starts)
+    # edges before validate(): on an edgeless mesh it reports every corner as a missing edge
+    me.update(calc_edges=True)
+
+
+def goz_import_settings():
+    """The import preferences parse_goz needs, read on the main thread"""
+    return {
+        'uv': prefs().import_uv,
+        'polypaint': prefs().import_polypaint,
+        'mask': prefs().import_mask,
+        'polygroups': (prefs().import_polygroups_to_vertexgroups or prefs().import_polygroups_to_facemaps
+                       or prefs().apply_facemaps_to_facesets),
+        # flip_forward_axis flips the winding on import
+        'flipped': prefs().flip_forward_axis,
+    }
+
+
+def goz_mesh_fingerprint(obj):
+    """Mesh identity recorded by the import cache: name and element counts, cheap to compare"""
+    me = obj.data
+    return me.name_full, len(me.vertices), len(me.loops), len(me.polygons)
+
+
+def goz_import_unchanged(objName, meshFingerprint):
+    """The object a cached import made still exists and holds the mesh it was given"""
+    obj = bpy.data.objects.get(objName)
+    return obj is not None and obj.type == 'MESH' and goz_mesh_fingerprint(obj) == meshFingerprint
+
+
+class GoZData:
+    """A GoZ file read and decoded into the arrays GoZit writes; close() releases the file"""
+
+    def __init__(self, path, reader):
+        self.path = path
+        self.reader = reader
+        self.name = reader.name
+        self.verts = None
+        # corners as written by fill_goz_mesh, and as a previous import stored them
+        self.corners = None
+        self.storedCorners = None
+        self.sizes = None
+        self.uvs = None
+        self.colors = None
+        self.mask = None
+        self.groups = None
+        self.textures = {}
+        self.parseTime = 0.0
+
+    def close(self):
+        self.verts = None
+        self.reader.close()
+
+
+def parsed_goz(future, pathFile):
+    """GoZData of a finished parse_goz future, None when parsing failed"""
+    try:
+        return future.result()
+    except Exception as e:
+        print(f"GoB: Cant read {pathFile}: {e}")
+        return None
+
+
+def parse_goz(pathFile, settings):
+    """Read and decode one GoZ file without touching Blender data, so it can run in a worker thread.
+    Returns GoZData, None for missing or empty files"""
+    start = time.perf_counter()
+    if not os.path.isfile(pathFile) or is_file_empty(pathFile):
+        print(f'Cant read mesh from: {pathFile}. Skipping')
+        return None
+    goz = GoZData(pathFile, goz_reader.GoZReader(pathFile))
+    try:
+        hasMesh = decode_goz(goz, settings)
+    except Exception:
+        goz.close()
+        raise
+    if not hasMesh:
+        print(f'No mesh data in: {pathFile}. Skipping')
+        goz.close()
+        return None
+    goz.parseTime = time.perf_counter() - start
+    return goz
+
+
+def decode_goz(goz, settings):
+    """Fill `goz` from its reader, False when the file holds no mesh"""
+    reader = goz.reader
+    vertsData = reader.array(goz_reader.TAG_VERTICES)
+    facesData = reader.array(goz_reader.TAG_FACES)
+    if vertsData is None or facesData is None:
+        return False
+
+    # positions stay a view of the file, read ahead while the rest is decoded
+    reader.prefetch(goz_reader.TAG_VERTICES)
+    goz.verts = vertsData
+    facesData, triMask = goz_reader.decode_faces(facesData)
+    goz.corners, goz.sizes = goz_corners(facesData, triMask)
+    goz.storedCorners = goz_corners(facesData, triMask, flipped=True)[0] if settings['flipped'] else goz.corners
+
+    if settings['uv'] and reader.has(goz_reader.TAG_UVS):
+        # zbrush always writes out 4 coords per face, the 4th is padding on triangles
+        goz.uvs = goz_corner_values(reader.array(goz_reader.TAG_UVS), triMask, flipped=settings['flipped'])
+        goz.uvs[:, 1] = 1.0 - goz.uvs[:, 1]
+
+    if settings['polypaint'] and reader.has(goz_reader.TAG_POLYPAINT):
+        # stored as BGRA bytes per vertex, alpha is unused
+        polypaintData = reader.array(goz_reader.TAG_POLYPAINT)
+        goz.colors = numpy.empty((len(polypaintData), 4), dtype=numpy.uint8)
+        goz.colors[:, :3] = polypaintData[:, 2::-1]
+        goz.colors[:, 3] = 255
+
+    if settings['mask'] and reader.has(goz_reader.TAG_MASK):
+        # zbrush stores the unmasked amount
+        goz.mask = 1.0 - reader.array(goz_reader.TAG_MASK).astype(numpy.float32) / 65535.0
+
+    if settings['polygroups'] and reader.has(goz_reader.TAG_POLYGROUPS):
+        goz.groups = reader.array(goz_reader.TAG_POLYGROUPS).astype(numpy.int32)
+
+    for tag in goz_reader.TEXTURE_TAGS:
+        texturePath = reader.texture_path(tag)
+        if texturePath is not None:
+            goz.textures[tag] = texturePath
+    return True
+
+
+def apply_transformation(me, is_import=True, flip_normals=True): 
     mat_transform = None
     scale = 1.0
     
@@ -1525,7 +1455,8 @@ def apply_transformation(me, is_import=True):
                     (0., 1., 0., 0.),
                     (0., 0., 0., 1.)]) * scale
                 )
-                me.flip_normals()
+                if flip_normals:
+                    me.flip_normals()
             else:
                 #export
                 mat_transform = mathutils.Matrix([
@@ -1559,7 +1490,8 @@ def apply_transformation(me, is_import=True):
                     (0., -1., 0., 0.),
                     (0., 0., 0., 1.)]) * scale
                 )
-                me.flip_normals()
+                if flip_normals:
+                    me.flip_normals()
             else:
                 #export
                 mat_transform = mathutils.Matrix([
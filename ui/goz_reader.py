@@ -0,0 +1,217 @@
+import hashlib
+import mmap
+import os
+import string
+import numpy
+from collections import OrderedDict
+from struct import unpack_from
+
+# ------------------------------
+# GoZ file reader
+# ------------------------------
+#
+# A GoZ file is a short header holding the object name followed by chunks:
+# tag (u32), chunk size in bytes (u32, header included), then the payload.
+# Data chunks start their payload with an element count (u64). The file is
+# memory-mapped and the chunk headers are scanned once into an offset index,
+# so only the chunks an import needs are touched; their data is returned as
+# NumPy views into the mapping, without copying. Views must be dropped before
+# the reader is closed. ImportCache remembers the files already imported by a
+# key of their stat and a hash of both ends, so unchanged files are skipped.
+
+TAG_NAME = 0x1389
+TAG_VERTICES = 0x2711
+TAG_FACES = 0x4E21
+TAG_UVS = 0x61A9
+TAG_POLYPAINT = 0x88B9
+TAG_MASK = 0x7532
+TAG_POLYGROUPS = 0x9C41
+TAG_DIFFUSE = 0xAFC9
+TAG_DISPLACEMENT = 0xD6D9
+TAG_NORMAL = 0xC351
+TAG_END = 0x0
+
+# Data chunks: (element dtype, element shape). Their length follows from the count,
+# like ZBrush reads them, rather than from the chunk size.
+DATA_LAYOUTS = {
+    TAG_VERTICES: ('<f4', (3,)),
+    TAG_FACES: ('<u4', (4,)),
+    TAG_UVS: ('<f4', (4, 2)),
+    TAG_POLYPAINT: ('u1', (4,)),
+    TAG_MASK: ('<u2', ()),
+    TAG_POLYGROUPS: ('<u2', ()),
+}
+TEXTURE_TAGS = (TAG_DIFFUSE, TAG_DISPLACEMENT, TAG_NORMAL)
+MAX_UNKNOWN_TAGS = 10
+
+NAME_OFFSET = 36
+
+# Import cache: files remembered, bytes hashed at each end of a file
+CACHE_SIZE = 256
+HASH_SPAN = 64 * 1024
+
+
+class GoZReader:
+    """Memory-mapped GoZ file: `name`, `index` {tag: (chunk offset, chunk length)} and views of its chunks"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._file.close()
+            raise
+        self.name = ""
+        self.index = {}
+        self.unknown_tags = []
+        self._scan()
+
+    def _scan(self):
+        data = self._map
+        name_length = unpack_from('<I', data, NAME_OFFSET)[0] - 16
+        name = data[NAME_OFFSET + 12:NAME_OFFSET + 12 + name_length]
+        # remove non ascii chars eg. /x 00
+        self.name = ''.join(letter for letter in name[8:].decode('utf-8', 'replace') if letter in string.printable)
+
+        offset = NAME_OFFSET + 12 + name_length
+        while offset + 8 <= len(data):
+            tag, size = unpack_from('<II', data, offset)
+            if tag == TAG_END:
+                break
+            layout = DATA_LAYOUTS.get(tag)
+            if layout is not None:
+                count = unpack_from('<Q', data, offset + 8)[0]
+                dtype, shape = layout
+                length = 16 + count * numpy.dtype(dtype).itemsize * int(numpy.prod(shape, dtype=numpy.int64))
+            elif tag == TAG_NAME or tag in TEXTURE_TAGS:
+                length = size
+            else:
+                self.unknown_tags.append(tag)
+                if len(self.unknown_tags) > MAX_UNKNOWN_TAGS:
+                    break
+                length = size
+            if length < 8:
+                break
+            # First chunk of a tag wins, like the sequential reader
+            self.index.setdefault(tag, (offset, length))
+            offset += length
+
+    def has(self, tag):
+        return tag in self.index
+
+    def count(self, tag):
+        offset, _ = self.index[tag]
+        return unpack_from('<Q', self._map, offset + 8)[0]
+
+    def array(self, tag):
+        """Read-only (count, *shape) view of a data chunk, None when the file has no such chunk"""
+        if tag not in self.index:
+            return None
+        dtype, shape = DATA_LAYOUTS[tag]
+        offset, _ = self.index[tag]
+        count = self.count(tag)
+        values = numpy.frombuffer(
+            self._map, dtype=dtype, count=count * int(numpy.prod(shape, dtype=numpy.int64)), offset=offset + 16
+        )
+        return values.reshape((count,) + shape)
+
+    def prefetch(self, tag):
+        """Ask the OS to read a chunk ahead, so touching its view later does not wait on the disk.
+        No-op where madvise is missing (Windows)"""
+        if tag not in self.index or not hasattr(mmap, 'MADV_WILLNEED'):
+            return
+        offset, length = self.index[tag]
+        start = offset - offset % mmap.PAGESIZE
+        self._map.madvise(mmap.MADV_WILLNEED, start, offset + length - start)
+
+    def block(self, tag):
+        """memoryview of the payload of a chunk (header excluded), None when missing"""
+        if tag not in self.index:
+            return None
+        offset, length = self.index[tag]
+        return memoryview(self._map)[offset + 8:offset + length]
+
+    def texture_path(self, tag):
+        if tag not in self.index:
+            return None
+        offset, length = self.index[tag]
+        return bytes(self._map[offset + 16:offset + length]).strip().decode('utf-8')
+
+    def close(self):
+        try:
+            self._map.close()
+        except BufferError:
+            # A view is still alive: the mapping goes away with it
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def decode_faces(faces):
+    """(N, 4) uint32 face block as vertex indices and a triangle mask.
+    Triangles are stored with 0xFFFFFFFF as 4th index, quads whose 4th index is 0 are rotated
+    so the 0 comes first"""
+    triangles = faces[:, 3] == 0xffffffff
+    leading_zero = faces[:, 3] == 0
+    if leading_zero.any():
+        faces = faces.copy()
+        faces[leading_zero] = numpy.roll(faces[leading_zero], 1, axis=1)
+    return faces, triangles
+
+
+def file_key(path):
+    """(path, size, mtime_ns, digest of the first and last HASH_SPAN bytes), None when the file can't be read.
+    The header holds the name and the first chunks, the tail the last ones, so a file written again
+    within the mtime resolution still gets a new key"""
+    try:
+        stat = os.stat(path)
+        with open(path, 'rb') as f:
+            digest = hashlib.blake2b(f.read(HASH_SPAN), digest_size=16)
+            if stat.st_size > HASH_SPAN:
+                f.seek(max(HASH_SPAN, stat.st_size - HASH_SPAN))
+                digest.update(f.read(HASH_SPAN))
+    except OSError:
+        return None
+    return path, stat.st_size, stat.st_mtime_ns, digest.hexdigest()
+
+
+class ImportCache:
+    """GoZ files already imported: one entry per path holding its file_key and what the import made,
+    least recently used evicted first"""
+
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        # path -> (file_key, object name, mesh fingerprint)
+        self._entries = OrderedDict()
+
+    def lookup(self, key):
+        """(object name, mesh fingerprint) imported from the file of `key`, None when the file changed
+        or was not imported"""
+        entry = self._entries.get(key[0])
+        if entry is None or entry[0] != key:
+            return None
+        self._entries.move_to_end(key[0])
+        return entry[1], entry[2]
+
+    def remember(self, key, object_name, mesh_fingerprint):
+        self._entries[key[0]] = (key, object_name, mesh_fingerprint)
+        self._entries.move_to_end(key[0])
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def forget(self, path):
+        self._entries.pop(path, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -4,6 +4,9 @@ from bpy.types import Panel, Menu, Operator
 from bpy.props import StringProperty
 from ..operators.new import OBJECT_OT_NewAsset  # Add this import
 from ..operators.import_move import QS_OT_import_latest_sm_fbx_to_cursor  # Import the new operator
+from ..operators import asset_index
+from ..operators import export_history
+from ..operators import upload_queue
 
 
 class WM_OT_placeholder(Operator):
@@ -155,6 +158,56 @@ class VIEW3D_PT_ExporterSettings(Panel):
         # row.prop(scene, "export_path", text="Override Path")
         # row.operator("wm.select_export_path", text="", icon='FILE_FOLDER')
 
+        if prefs and prefs.worker_count > 0:
+            layout.operator("export_scene.ue_fbx_workers", icon='SORTTIME')
+
+        if context.active_object:
+            draw_attribute_rules(layout, asset_index.index.root(context.active_object))
+
+        if prefs and getattr(prefs, "history_enabled", False):
+            draw_export_history(layout, prefs)
+
+
+def draw_attribute_rules(layout, root):
+    rules = root.ue_export_rules
+    box = layout.box()
+    row = box.row()
+    row.label(text=f"Attributes: {root.name}", icon='GROUP_UVS')
+    row.prop(rules, "enabled", text="")
+    col = box.column()
+    col.enabled = rules.enabled
+    col.prop(rules, "uv_maps_to_keep")
+    col.prop(rules, "drop_color_attributes")
+    col.prop(rules, "keep_attributes")
+
+
+def draw_export_history(layout, prefs, limit=5):
+    box = layout.box()
+    box.label(text="Export History", icon='TIME')
+    slowest = export_history.slowest_assets(limit)
+    if not slowest:
+        row = box.row()
+        row.enabled = False
+        row.label(text="No exports recorded yet")
+        return
+
+    col = box.column(align=True)
+    col.label(text="Slowest assets:")
+    for asset, total_time in slowest:
+        row = col.row()
+        row.label(text=asset)
+        row.label(text=f"{total_time:.2f} s")
+
+    flagged = export_history.regressions(prefs.history_regression_threshold, prefs.history_window)
+    if flagged:
+        col = box.column(align=True)
+        col.label(text="Regressions:", icon='ERROR')
+        for asset, latest, median, rise in flagged[:limit]:
+            row = col.row()
+            row.alert = True
+            row.label(text=asset)
+            row.label(text=f"median {median:.2f} s → {latest:.2f} s")
+
 # -----------------------------------------------------------------------------
 # Pie Menu definition
 # -----------------------------------------------------------------------------
@@ -239,6 +292,17 @@ def draw_topbar_ue_export_path(self, context):
     display_text = abbreviate_path(scene.export_path)
     op = row.operator("wm.show_export_path", text=display_text, icon='COPYDOWN')
     op.path = scene.export_path
+    draw_upload_status(row)
+
+
+def draw_upload_status(layout):
+    pending, failed = upload_queue.queue.status()
+    if pending:
+        layout.label(text=f"Uploading {len(pending)}", icon='EXPORT')
+    if failed:
+        sub = layout.row(align=True)
+        sub.alert = True
+        sub.operator("wm.ue_clear_failed_uploads", text=f"{len(failed)} failed", icon='ERROR')
 
 # -----------------------------------------------------------------------------
 # Registration (single, cleaned, idempotent)